@@ -1682,8 +1682,7 @@ class mpl_2D:
             self.xaxis = axes[1]
             self.yaxis = axes[0]
             channel = channels[channel_index]
-            zi = channel.values
-            zi = np.ma.masked_invalid(zi)
+            zi = np.ma.array(np.ma.getdata(channel.values), mask=~channel.valid)
             # normalize slices ------------------------------------------------
             if normalize_slices == 'both':
                 pass
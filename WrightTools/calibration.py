@@ -307,10 +307,9 @@ class Calibration:
         headers['axis names'] = self.axis_names
         headers['axis units'] = self.axis_units
         headers['note'] = self.note
-        file_path = wt_kit.write_headers(file_path, headers)
         X = np.vstack([self.points, self.values]).T
-        with open(file_path, 'ab') as f:
-            np.savetxt(f, X, fmt=str('%6e'), delimiter='\t')
+        with wt_kit.TextWriter(file_path, headers, fmt='%6e') as writer:
+            writer.write(X)
         # plot
         if plot:
             save_directory = save_directory
@@ -328,7 +327,7 @@ class Calibration:
 def from_file(path):
     # get raw information from file
     headers = wt_kit.read_headers(path)
-    arr = np.genfromtxt(path).T
+    arr = wt_kit.read_array(path).T
     name = os.path.basename(path).split(' - ')[0]
     # construct calibration object
     points = arr[0:-1]
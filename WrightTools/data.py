@@ -13,6 +13,9 @@ import sys
 import ast
 import copy
 import time
+import inspect
+import importlib
+import functools
 import collections
 import warnings
 import pickle
@@ -24,6 +27,7 @@ from scipy.interpolate import griddata, interp1d
 
 from . import exceptions as wt_exceptions
 from . import kit as wt_kit
+from . import shots_processing as wt_shots_processing
 from . import units as wt_units
 
 
@@ -39,6 +43,109 @@ else:
     string_type = str  # newer versions of python don't have unicode type
 
 
+### journal ###################################################################
+
+
+def _journal_parameter(value):
+    '''
+    Represent a method argument for storage in the journal. Simple values are
+    kept, everything else (arrays, data objects...) is stored as its repr so
+    that the journal never holds on to large objects.
+    '''
+    if value is None or isinstance(value, (bool, int, float, string_type)):
+        return value
+    if type(value) in [list, tuple] and len(value) < 32:
+        return type(value)(_journal_parameter(v) for v in value)
+    return repr(value)
+
+
+def _journaled(channels=None, inverse=None):
+    '''
+    Decorator for Data methods that change the data object in place.
+
+    Calling a decorated method appends a record to the journal of the data
+    object. The record contains the parameters of the call and the minimal
+    information needed to undo it. Only the outermost journaled call is
+    recorded, so methods that call other methods (transpose, flip...)
+    internally produce a single record. The journal keeps at most
+    Data.journal_length records, oldest records are dropped first.
+
+    Parameters
+    ----------
+    channels : {None, 'all'} or str (optional)
+        Channels whose values may be changed by the method. None means that
+        no channel values are changed, 'all' means that all channels may be
+        changed. Any other string is interpreted as the name of the argument
+        that identifies the channel (None as argument value means all
+        channels). Default is None.
+    inverse : {None, 'transpose', 'flip', 'values'} (optional)
+        For exactly reversible transforms no values are stored, the transform
+        is simply inverted on undo. For 'values', the method itself records
+        how to invert its change of channel values (Data._journal_inverse),
+        falling back to a snapshot (Data._journal_snapshot) where it cannot.
+        Default is None.
+    '''
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            if not hasattr(self, '_journal'):  # e.g. old pickles
+                self._journal = []
+                self._journal_depth = 0
+            if self._journal_depth > 0:
+                return method(self, *args, **kwargs)
+            # parameters
+            callargs = inspect.getcallargs(method, self, *args, **kwargs)
+            callargs.pop('self')
+            for key, value in list(callargs.items()):
+                if type(value) == dict:  # **kwargs
+                    callargs.update(callargs.pop(key))
+            parameters = collections.OrderedDict()
+            for key in sorted(callargs.keys()):
+                parameters[key] = _journal_parameter(callargs[key])
+            # undo record
+            undo = {}
+            if inverse == 'transpose':
+                undo['axis_names'] = list(self.axis_names)
+            elif inverse == 'flip':
+                axis = callargs['axis']
+                if isinstance(axis, string_type):
+                    axis = self.axis_names.index(axis)
+                undo['flip'] = self.axes[axis].name
+            elif inverse == 'values':
+                undo['channel_stats'] = [(c,) + c._stats() for c in self._journal_channels(channels, callargs)]
+                undo['inverses'] = []
+                undo['channel_states'] = []
+                self._journal_pending = undo
+            else:
+                undo['axes'] = list(self.axes)
+                undo['constants'] = list(self.constants)
+                undo['channels'] = list(self.channels)
+                undo['axis_states'] = [(a, np.copy(a.points), a.units) for a in self.axes + self.constants]
+                undo['channel_states'] = [(c, c.values.copy()) + c._stats() for c in self._journal_channels(channels, callargs)]
+            # call
+            self._journal_depth += 1
+            try:
+                out = method(self, *args, **kwargs)
+            finally:
+                self._journal_depth -= 1
+                self._journal_pending = None
+            # compress channel states to the regions that actually changed
+            if 'channel_states' in undo:
+                undo['channel_states'] = [self._journal_compress(state) for state in undo['channel_states']]
+            record = collections.OrderedDict()
+            record['method'] = method.__name__
+            record['parameters'] = parameters
+            record['undo'] = undo
+            self._journal.append(record)
+            dropped = len(self._journal) - self.journal_length
+            if dropped > 0:
+                self._journal_dropped = getattr(self, '_journal_dropped', 0) + dropped
+                del self._journal[:dropped]
+            return out
+        return wrapper
+    return decorator
+
+
 ### data class ################################################################
 
 
@@ -146,16 +253,19 @@ class Axis:
 
 class Channel:
 
+    mask = None  # class attribute, so that old pickles have a mask as well
+
     def __init__(self, values, units=None,
                  file_idx=None,
                  znull=None, zmin=None, zmax=None, signed=None,
-                 name='channel', label=None, label_seed=None):
+                 name='channel', label=None, label_seed=None, mask=None):
         # import
         self.name = name
         self.label = label
         self.label_seed = label_seed
         self.units = units
         self.file_idx = file_idx
+        self.mask = mask
         # values
         if values is not None:
             self.give_values(np.asarray(values), znull, zmin, zmax, signed)
@@ -168,13 +278,39 @@ class Channel:
     def __repr__(self):
         return 'WrightTools.data.Channel object \'{0}\' at {1}'.format(self.name, str(id(self)))
 
+    def _check_mask(self):
+        '''
+        Raise a ValueError if the mask does not match the values.
+        '''
+        if self.mask.shape != np.shape(self.values):
+            raise ValueError('mask of channel {0} has shape {1}, values have shape {2}'.format(
+                self.name, self.mask.shape, np.shape(self.values)))
+
+    def _masked_values(self):
+        '''
+        Values with nans written wherever the mask declares them invalid.
+        Returns the values array itself if there is no mask.
+        '''
+        if self.mask is None:
+            return self.values
+        self._check_mask()
+        return np.where(self.mask.valid, self.values, np.nan)
+
     def _update(self):
-        self.zmin = np.nanmin(self.values)
-        self.zmax = np.nanmax(self.values)
+        if self.mask is None:
+            self.zmin = np.nanmin(self.values)
+            self.zmax = np.nanmax(self.values)
+        else:
+            values = self.values[self.valid]
+            self.zmin = np.nanmin(values) if values.size else np.nan
+            self.zmax = np.nanmax(values) if values.size else np.nan
 
     def _pupdate(self,*args,**kwargs):
         return self._update(*args,**kwargs)
 
+    def _stats(self):
+        return self.znull, self.zmin, self.zmax, self.signed, self.mask
+
     def clip(self, zmin=None, zmax=None, replace='nan'):
         '''
         clip (limit) the values in a channel \n
@@ -196,9 +332,9 @@ class Channel:
             self.values[self.values < zmin] = np.nan
             self.values[self.values > zmax] = np.nan
         elif replace == 'mask':
-            self.values = np.ma.masked_outside(self.values,
-                                               zmin, zmax,
-                                               copy=False)
+            with np.errstate(invalid='ignore'):
+                outside = (self.values < zmin) | (self.values > zmax)
+            self.mask = Mask(self.valid & ~outside)
         else:
             print('replace not recognized in channel.clip')
         # recalculate zmin and zmax of channel object
@@ -268,38 +404,50 @@ class Channel:
 
     def max(self):
         '''
-        Maximum, ignorning nans.
+        Maximum, ignorning nans and masked points.
         '''
-        return np.nanmax(self.values)
+        if self.mask is None:
+            return np.nanmax(self.values)
+        return np.nanmax(self.values[self.valid])
 
     def min(self):
         '''
-        Minimum, ignoring nans.
+        Minimum, ignoring nans and masked points.
         '''
-        return np.nanmin(self.values)
+        if self.mask is None:
+            return np.nanmin(self.values)
+        return np.nanmin(self.values[self.valid])
 
     def normalize(self, axis=None):
         '''
         Normalizes a Channel, setting z-null to 0 and the max to 1.
         '''
+        offset, factor = self._normalization(axis)
+        # subtract off znull
+        self.values -= offset
+        self.znull = 0.
+        # divide through by max
+        self.values /= factor
+        # finish
+        self._update()
+
+    def _normalization(self, axis=None):
+        '''
+        The offset (znull) and factors (max, keeping dimensions) that
+        normalize does subtract and divide by.
+        '''
         # process axis argument
         if axis is not None:
             if hasattr(axis, '__contains__'):  # list, tuple or similar
                 axis = tuple((int(i) for i in axis))
             else:  # presumably a simple number
                 axis = int(axis)
-        # subtract off znull
-        self.values -= self.znull
-        self.znull = 0.
         # create dummy array
-        dummy = self.values.copy()
-        dummy[np.isnan(dummy)] = 0  # nans are propagated in np.amax
+        dummy = self.values - self.znull
+        dummy[~self.valid] = 0  # nans are propagated in np.amax
         if self.signed:
             dummy = np.absolute(dummy)
-        # divide through by max
-        self.values /= np.amax(dummy, axis=axis, keepdims=True)
-        # finish
-        self._update()
+        return self.znull, np.amax(dummy, axis=axis, keepdims=True)
 
     def trim(self, neighborhood, method='ztest', factor=3, replace='nan',
              verbose=True):
@@ -368,8 +516,9 @@ class Channel:
         elif replace == 'mean':
             self.values[i] = means
         elif replace == 'mask':
-            self.values = np.ma.array(self.values)
-            self.values[i] = np.ma.masked
+            valid = self.valid
+            valid[i] = False
+            self.mask = Mask(valid)
         elif type(replace) in [int, float]:
             self.values[i] = replace
         else:
@@ -380,6 +529,22 @@ class Channel:
             print('%i outliers removed'%len(outliers))
         return outliers
 
+    @property
+    def valid(self):
+        '''
+        Boolean array, True where values are valid. Points are invalid where
+        the mask (if any) declares them so, and wherever values are nan, inf
+        or numpy masked, e.g. after clip or trim.
+        '''
+        valid = ~np.ma.getmaskarray(self.values)
+        values = np.ma.getdata(self.values)
+        if values.dtype.kind in 'fc':
+            valid &= np.isfinite(values)
+        if self.mask is not None:
+            self._check_mask()
+            valid &= self.mask.valid
+        return valid
+
     @ property
     def zmag(self):
         return max((self.zmax-self.znull, self.znull-self.zmin))
@@ -387,6 +552,8 @@ class Channel:
 
 class Data:
 
+    journal_length = 10  # maximum number of operations that can be undone
+
     def __init__(self, axes, channels, constants=[],
                  name='', source=None):
         '''
@@ -414,8 +581,20 @@ class Data:
         self.source = source
         # update
         self._update()
-        # reserve a copy of own self at this stage
-        self._original = self.copy()
+        # journal of operations, used to undo them
+        self._journal = []
+        self._journal_depth = 0
+        self._journal_pending = None
+        self._journal_dropped = 0  # records removed to respect journal_length
+
+    def __getstate__(self):
+        # the journal is not copied or pickled
+        state = self.__dict__.copy()
+        state['_journal'] = []
+        state['_journal_depth'] = 0
+        state['_journal_pending'] = None
+        state['_journal_dropped'] = 0
+        return state
 
     def __repr__(self):
         return 'WrightTools.data.Data object \'{0}\' {1} at {2}'.format(self.name, str(self.axis_names), str(id(self)))
@@ -441,6 +620,150 @@ class Data:
     def _pupdate(self,*args,**kwargs):
         return self._update(*args,**kwargs)
 
+    def _transform_masks(self, function, channels=None):
+        '''
+        Apply function to the validity arrays of all channel masks, keeping
+        masks that were shared between channels shared.
+        '''
+        if channels is None:
+            channels = self.channels
+        done = {}
+        for channel, source in zip(channels, self.channels):
+            mask = source.mask
+            if mask is None:
+                continue
+            if id(mask) not in done:
+                done[id(mask)] = Mask(function(mask.valid))
+            channel.mask = done[id(mask)]
+
+    def _journal_channels(self, channels, callargs):
+        '''
+        Resolve the channels argument of _journaled into channel objects.
+        '''
+        if channels is None:
+            return []
+        if channels == 'all' or callargs[channels] is None:
+            return list(self.channels)
+        channel = callargs[channels]
+        if isinstance(channel, string_type):
+            return [self.channels[self.channel_names.index(channel)]]
+        return [self.channels[int(channel)]]
+
+    def _journal_compress(self, state):
+        '''
+        Reduce a stored channel state to the indicies that actually changed,
+        if that is smaller than storing the whole array.
+        '''
+        channel, old = state[:2]
+        new = channel.values
+        if type(old) is not np.ndarray or type(new) is not np.ndarray:
+            return state
+        if old.shape != new.shape or old.dtype != new.dtype:
+            return state
+        with np.errstate(invalid='ignore'):
+            same = old == new
+        if old.dtype.kind in 'fc':
+            same |= np.isnan(old) & np.isnan(new)
+        changed = np.nonzero(~same)
+        if changed[0].size * (old.ndim + 1) * 8 >= old.nbytes // 2:
+            return state
+        return (channel, (changed, old[changed])) + state[2:]
+
+    def _journal_inverse(self, channel, kind, parameters=()):
+        '''
+        Record how to invert a change of channel values, from within a method
+        journaled with inverse='values', before the values are changed.
+
+        Parameters
+        ----------
+        channel : Channel
+            The channel about to be changed.
+        kind : {'affine', 'amplitude', 'log'}
+            The change. 'affine' is (values - offset) / factor, with
+            parameters (offset, factor). 'amplitude' and 'log' are the
+            corresponding kinds of scale.
+        parameters : tuple (optional)
+            Parameters of the change.
+        '''
+        pending = getattr(self, '_journal_pending', None)
+        if pending is None:
+            return
+        values = channel.values
+        if kind == 'affine':
+            offset, factor = parameters
+            invertible = np.all(np.isfinite(offset)) and np.all(np.isfinite(factor)) and np.all(factor != 0)
+        elif kind == 'log':
+            with np.errstate(invalid='ignore'):
+                invertible = not np.any(values <= 0)
+        else:
+            invertible = True
+        if invertible:
+            pending['inverses'].append((channel, kind, parameters))
+        else:
+            self._journal_snapshot(channel)
+
+    def _journal_snapshot(self, channel):
+        '''
+        Store the values of a channel from within a method journaled with
+        inverse='values', before they are changed in a way that cannot be
+        inverted.
+        '''
+        pending = getattr(self, '_journal_pending', None)
+        if pending is None:
+            return
+        pending['channel_states'].append((channel, channel.values.copy()) + channel._stats())
+
+    def _journal_undo(self, record):
+        '''
+        Undo a single journal record.
+        '''
+        undo = record['undo']
+        if 'axis_names' in undo:
+            axes = [self.axis_names.index(name) for name in undo['axis_names']]
+            self.transpose(axes, verbose=False)
+        elif 'flip' in undo:
+            self.flip(undo['flip'])
+        else:
+            if 'axes' in undo:
+                self.axes = list(undo['axes'])
+                self.constants = list(undo['constants'])
+                self.channels = list(undo['channels'])
+                for axis, points, units in undo['axis_states']:
+                    axis.points = points
+                    axis.units = units
+            for channel, kind, parameters in undo.get('inverses', [])[::-1]:
+                if kind == 'affine':
+                    offset, factor = parameters
+                    channel.values = channel.values * factor + offset
+                elif kind == 'amplitude':
+                    channel.values = channel.values * np.abs(channel.values)
+                elif kind == 'log':
+                    channel.values = 10 ** channel.values
+            for channel, znull, zmin, zmax, signed, mask in undo.get('channel_stats', []):
+                channel.znull = znull
+                channel.zmin = zmin
+                channel.zmax = zmax
+                channel.signed = signed
+                channel.mask = mask
+            for channel, values, znull, zmin, zmax, signed, mask in undo['channel_states']:
+                if type(values) is tuple:  # changed region only
+                    idx, old = values
+                    channel.values[idx] = old
+                else:
+                    channel.values = values
+                channel.znull = znull
+                channel.zmin = zmin
+                channel.zmax = zmax
+                channel.signed = signed
+                channel.mask = mask
+        # remove attributes of axes and channels that no longer exist
+        names = [obj.name for obj in self.axes + self.channels + self.constants]
+        for name in self.axis_names + self.channel_names + self.constant_names:
+            if name not in names and hasattr(self, name):
+                delattr(self, name)
+        self._update()
+
+    @_journaled()
     def bring_to_front(self, channel):
         '''
         Bring a specific channel to the zero-indexed position in channels.
@@ -579,6 +902,12 @@ class Data:
                 for idx in constant_indicies:
                     values = values[idx]
                 channels_chopped[i].values = values
+            def chop_mask(valid):
+                valid = valid.transpose(transpose_order)
+                for idx in constant_indicies:
+                    valid = valid[idx]
+                return valid
+            self._transform_masks(chop_mask, channels_chopped)
             # finish iteration
             data_out = Data(axes_chopped, copy.deepcopy(channels_chopped),
                             constants=constants,
@@ -589,6 +918,7 @@ class Data:
             print('chopped data into %d piece(s)'%len(out), 'in', axes_args)
         return out
 
+    @_journaled(channels='channel')
     def clip(self, channel=0, *args, **kwargs):
         '''
         Wrapper method for Channel.clip. \n
@@ -609,6 +939,7 @@ class Data:
         # call clip on channel object
         channel.clip(*args, **kwargs)
 
+    @_journaled(channels='all')
     def collapse(self, axis, method='integrate'):
         '''
         Collapse the dataset along one axis.
@@ -646,16 +977,24 @@ class Data:
             methods = [method for _ in self.channels]
         # collapse ------------------------------------------------------------
         for method, channel in zip(methods, self.channels):
+            # masked points are ignored, where the method allows it
+            if channel.mask is None:
+                values = channel.values
+                summ, average = np.sum, np.average
+            else:
+                values = channel._masked_values()
+                summ, average = np.nansum, np.nanmean
+                channel.mask = None
             if method in ['int', 'integrate']:
-                channel.values = np.trapz(y=channel.values, x=self.axes[axis_index].points, axis=axis_index)
+                channel.values = np.trapz(y=values, x=self.axes[axis_index].points, axis=axis_index)
             elif method == 'sum':
-                channel.values = channel.values.sum(axis=axis_index)
+                channel.values = summ(values, axis=axis_index)
             elif method in ['max', 'maximum']:
-                channel.values = np.nanmax(channel.values, axis=axis_index)
+                channel.values = np.nanmax(values, axis=axis_index)
             elif method in ['min', 'minimum']:
-                channel.values = np.nanmin(channel.values, axis=axis_index)
+                channel.values = np.nanmin(values, axis=axis_index)
             elif method in ['ave', 'average']:
-                channel.values = np.average(channel.values, axis=axis_index)
+                channel.values = average(values, axis=axis_index)
             else:
                 print('method not recognized in data.collapse')
             channel._update()
@@ -663,6 +1002,7 @@ class Data:
         self.axes.pop(axis_index)
         self._update()
 
+    @_journaled()
     def convert(self, destination_units, verbose=True):
         '''
         Converts all compatable constants and axes to given units.
@@ -698,7 +1038,7 @@ class Data:
         Returns
         -------
         data
-            A deep copy of the data object.
+            A deep copy of the data object. The journal is not copied.
         '''
         return copy.deepcopy(self)
 
@@ -706,6 +1046,22 @@ class Data:
     def dimensionality(self):
         return len(self.axes)
 
+    @property
+    def mask(self):
+        '''
+        The validity mask shared by all channels, or None if the channels do
+        not share one.
+
+        See Also
+        --------
+        share_mask
+        '''
+        masks = [channel.mask for channel in self.channels]
+        if masks[0] is not None and all(m is masks[0] for m in masks):
+            return masks[0]
+        return None
+
+    @_journaled(channels='channel')
     def divide(self, divisor, channel=0, divisor_channel=0):
         '''
         Divide a given channel by another data object. Divisor may be self.
@@ -763,6 +1119,7 @@ class Data:
         # transpose out
         self.transpose(transpose_order, verbose=False)
 
+    @_journaled(channels='signal_channel')
     def dOD(self, signal_channel, reference_channel,
             method='digital'):
         r'''
@@ -820,6 +1177,241 @@ class Data:
         self.channels[signal_channel_index].znull = 0
         self.channels[signal_channel_index]._update()
 
+    def export(self, filepath=None, channels=None, region=None, fmt='%.17g',
+               block_rows=2**14, verbose=True):
+        '''
+        Export to a PyCMDS formatted text file, which from_PyCMDS can read.
+        Rows are formatted and written in blocks, so the full table is never
+        held in memory. Points where every exported channel is invalid are
+        not written. Constants are recorded in the header.
+
+        Parameters
+        ----------
+        filepath : str (optional)
+            The savepath. If not defined, the file will be saved in the
+            current working directory with a timestamp.
+        channels : list of int or str (optional)
+            Channels to export. If None, all channels. Default is None.
+        region : dict (optional)
+            Axis names mapped to (min, max) tuples, in axis units. Only
+            points within every given range are exported. Default is None
+            (everything).
+        fmt : str (optional)
+            Format of each number. Default is '%.17g' (exact for 64 bit
+            floats).
+        block_rows : int (optional)
+            Number of rows formatted at once. Default is 2**14.
+        verbose : bool (optional)
+            Toggle talkback. Default is True.
+
+        Returns
+        -------
+        str
+            The filepath of the exported file.
+
+        See Also
+        --------
+        from_PyCMDS
+        '''
+        # get filepath
+        if not filepath:
+            chdir = os.getcwd()
+            timestamp = wt_kit.get_timestamp()
+            filepath = os.path.join(chdir, timestamp + ' data.data')
+        # channels
+        if channels is None:
+            channels = list(range(len(self.channels)))
+        channels = [self.channels[self.channel_names.index(c) if isinstance(c, string_type) else int(c)]
+                    for c in channels]
+        # region, as indicies along each axis
+        if region is None:
+            region = {}
+        keeps = []
+        for axis in self.axes:
+            keep = np.ones(axis.points.size, dtype=bool)
+            if axis.name in region.keys():
+                lower, upper = region[axis.name]
+                keep &= (axis.points >= lower) & (axis.points <= upper)
+            keeps.append(np.flatnonzero(keep))
+        shape = tuple(keep.size for keep in keeps)
+        # headers
+        names = [axis.name for axis in self.axes]
+        labels = [axis.label_seed[0] if axis.label_seed else '' for axis in self.axes]
+        headers = collections.OrderedDict()
+        headers['data name'] = self.name
+        headers['data origin'] = self.source if isinstance(self.source, string_type) else ''
+        headers['axis names'] = names
+        headers['axis identities'] = names
+        headers['axis units'] = [axis.units for axis in self.axes]
+        headers['axis interpolate'] = [False] * len(self.axes)
+        headers['constant names'] = [constant.name for constant in self.constants]
+        headers['constant identities'] = [constant.name for constant in self.constants]
+        headers['constant units'] = [constant.units for constant in self.constants]
+        for axis, keep in zip(self.axes, keeps):
+            headers[axis.name + ' points'] = axis.points[keep]
+        for constant in self.constants:
+            headers[constant.name + ' points'] = float(np.mean(constant.points))
+        headers['channel signed'] = [bool(channel.signed) for channel in channels]
+        headers['name'] = [n + '_index' for n in names] + names + [c.name for c in channels]
+        headers['kind'] = [None] * len(names) + ['hardware'] * len(names) + ['channel'] * len(channels)
+        headers['units'] = [None] * len(names) + headers['axis units'] + [c.units for c in channels]
+        headers['label'] = [''] * len(names) + labels + [c.label or '' for c in channels]
+        # rows
+        grid = np.ix_(*keeps)
+        values = [channel._masked_values()[grid] for channel in channels]
+        valid = np.zeros(shape, dtype=bool)
+        for v in values:
+            valid |= ~np.isnan(v)
+        with wt_kit.TextWriter(filepath, headers, fmt=fmt) as writer:
+            flat = np.flatnonzero(valid)
+            for start in range(0, flat.size, block_rows):
+                idx = np.unravel_index(flat[start:start+block_rows], shape)
+                columns = list(idx)
+                columns += [axis.points[keep[i]] for axis, keep, i in zip(self.axes, keeps, idx)]
+                columns += [v[idx] for v in values]
+                writer.write(np.column_stack(columns))
+        # return
+        if verbose:
+            print('data exported to', filepath)
+        return filepath
+
+    def fft(self, axis, channels=None, pad=None, window=None, units='wn',
+            chunk=None, verbose=True):
+        '''
+        Fourier transform along one axis, returning a new data object.
+
+        All requested channels are transformed in one batched call. Real
+        channels use the real transform (positive frequencies only), complex
+        channels use the full transform, shifted so that frequencies ascend.
+        Nans are treated as zeros.
+
+        Parameters
+        ----------
+        axis : int or str
+            The axis to transform along. Points must be evenly spaced.
+        channels : list of int or str (optional)
+            Channels to transform. If None, all channels are transformed.
+            Default is None.
+        pad : {None, 'fast'} or int (optional)
+            Zero-padding. If 'fast', the axis is padded to the next length
+            that can be transformed quickly. An integer pads to that length.
+            Default is None (no padding).
+        window : {None, 'hann', 'hamming', 'blackman', 'bartlett', 'kaiser'} or 1D array (optional)
+            Apodization window applied along axis before padding. Default is
+            None.
+        units : str (optional)
+            Units of the new frequency axis, if axis has delay or time units.
+            Other axes yield a frequency axis without units. Default is wn.
+        chunk : int (optional)
+            If given, the transform is done in blocks of this many slices
+            along the first other axis, limiting the size of temporary
+            arrays for large datasets. Default is None.
+        verbose : bool (optional)
+            Toggle talkback. Default is True.
+
+        Returns
+        -------
+        data
+            New data object with the frequency axis in place of axis.
+        '''
+        import scipy.fftpack
+        # axis ----------------------------------------------------------------
+        if type(axis) == int:
+            axis_index = axis
+        elif isinstance(axis, string_type):
+            axis_index = self.axis_names.index(axis)
+        else:
+            raise TypeError('axis type {} not valid'.format(type(axis)))
+        axis = self.axes[axis_index]
+        n = axis.points.size
+        # channels ------------------------------------------------------------
+        if channels is None:
+            channels = list(self.channels)
+        else:
+            channels = [self.channels[self.channel_names.index(c)] if isinstance(c, string_type) else self.channels[c] for c in channels]
+        real = all(np.isrealobj(c.values) for c in channels)
+        # length and window ---------------------------------------------------
+        if pad is None:
+            length = n
+        elif pad == 'fast':
+            length = scipy.fftpack.next_fast_len(n)
+        else:
+            length = max(int(pad), n)
+        if window is None:
+            w = None
+        elif isinstance(window, string_type):
+            functions = {'hann': np.hanning, 'hamming': np.hamming,
+                         'blackman': np.blackman, 'bartlett': np.bartlett,
+                         'kaiser': lambda m: np.kaiser(m, 5.)}
+            w = functions[window](n)
+        else:
+            w = np.asarray(window)
+        if w is not None:
+            w_shape = [1] * (len(self.shape) + 1)
+            w_shape[axis_index+1] = n
+            w = w.reshape(w_shape)
+        # frequencies ---------------------------------------------------------
+        ascending = axis.points[-1] >= axis.points[0]
+        d = abs(axis.points[-1] - axis.points[0]) / (n - 1)
+        if axis.units_kind in ['delay', 'time']:
+            if axis.units_kind == 'delay':
+                d = wt_units.converter(d, axis.units, 'fs') * 1e-15
+            else:
+                d = wt_units.converter(d, axis.units, 's_t')
+        if real:
+            frequencies = np.fft.rfftfreq(length, d)
+        else:
+            frequencies = np.fft.fftshift(np.fft.fftfreq(length, d))
+        if axis.units_kind in ['delay', 'time']:
+            with np.errstate(divide='ignore'):
+                frequencies = wt_units.converter(frequencies, 'Hz', units)
+            frequencies_units = units
+        else:
+            frequencies_units = None
+        # transform -----------------------------------------------------------
+        out_shape = list(self.shape)
+        out_shape[axis_index] = frequencies.size
+        out = np.empty([len(channels)] + out_shape, dtype=complex)
+        others = [i for i in range(len(self.shape)) if i != axis_index]
+        if chunk is None or not others:
+            starts = [0]
+            step = None
+        else:
+            step = max(1, int(chunk))
+            starts = range(0, self.shape[others[0]], step)
+        for start in starts:
+            out_slc = [slice(None)] * len(self.shape)
+            if step is not None:
+                out_slc[others[0]] = slice(start, start+step)
+            in_slc = list(out_slc)
+            if not ascending:
+                in_slc[axis_index] = slice(None, None, -1)
+            block = np.array([c.values[tuple(in_slc)] for c in channels], dtype=float if real else complex)
+            block[np.isnan(block)] = 0.
+            if w is not None:
+                block *= w
+            if real:
+                block = np.fft.rfft(block, n=length, axis=axis_index+1)
+            else:
+                block = np.fft.fftshift(np.fft.fft(block, n=length, axis=axis_index+1), axes=axis_index+1)
+            out[tuple([slice(None)] + out_slc)] = block
+        # assemble ------------------------------------------------------------
+        axes = [copy.deepcopy(a) for a in self.axes]
+        axes[axis_index] = Axis(frequencies, frequencies_units,
+                                name=axis.name + '_f', label_seed=axis.label_seed)
+        new_channels = []
+        for values, channel in zip(out, channels):
+            zmag = np.abs(values).max()
+            new_channels.append(Channel(values, channel.units, znull=0., zmin=-zmag,
+                                        zmax=zmag, signed=True, name=channel.name,
+                                        label=channel.label, label_seed=channel.label_seed))
+        data = Data(axes, new_channels, constants=copy.deepcopy(self.constants),
+                    name=self.name, source=self.source)
+        if verbose:
+            print('data transformed along {0} to new shape: {1}'.format(axis.name, data.shape))
+        return data
+
+    @_journaled(inverse='flip')
     def flip(self, axis):
         '''
         Flip direction of arrays along an axis. Changes the index of elements
@@ -853,6 +1445,9 @@ class Data:
             # transpose out
             values = values.transpose(transpose_order)
             channel.values = values
+        slc = [slice(None)] * len(self.axes)
+        slc[axis_index] = slice(None, None, -1)
+        self._transform_masks(lambda valid: valid[tuple(slc)])
 
     def get_nadir(self, channel=0):
         '''
@@ -878,7 +1473,7 @@ class Data:
         channel = self.channels[channel_index]
         # get indicies
         arr = channel.values
-        idxs = np.unravel_index(arr.argmin(), arr.shape)
+        idxs = np.unravel_index(np.nanargmin(arr), arr.shape)
         # finish
         return [a.points[i] for a, i in zip(self.axes, idxs)]
 
@@ -906,12 +1501,13 @@ class Data:
         channel = self.channels[channel_index]
         # get indicies
         arr = channel.values
-        idxs = np.unravel_index(arr.argmax(), arr.shape)
+        idxs = np.unravel_index(np.nanargmax(arr), arr.shape)
         # finish
         return [a.points[i] for a, i in zip(self.axes, idxs)]
 
+    @_journaled(channels='channel')
     def heal(self, channel=0, method='linear', fill_value=np.nan,
-             verbose=True):
+             blocks=None, workers=1, verbose=True):
         '''
         Remove nans from channel using interpolation.
 
@@ -926,13 +1522,20 @@ class Data:
         fill_value : number-like (optional)
             The value written to pixels that cannot be filled by interpolation.
             Default is nan.
+        blocks : int or list of int (optional)
+            Number of blocks along each axis. If given (linear method only),
+            the grid is interpolated block by block, see
+            kit.interpolate_blocked. Default is None (global interpolation).
+        workers : int (optional)
+            Number of processes used for blocked interpolation. Default is 1.
         verbose : bool (optional)
             Toggle talkback. Default is True.
 
         Notes
         -----
         Healing may take several minutes for large datasets. Interpolation
-        time goes as nearest, linear, then cubic.
+        time goes as nearest, linear, then cubic. Blocked interpolation
+        keeps memory bounded for large, high dimensional datasets.
         '''
         timer = wt_kit.Timer(verbose=False)
         with timer:
@@ -944,7 +1547,7 @@ class Data:
             else:
                 print('channel type', type(channel), 'not valid')
             channel = self.channels[channel_index]
-            values = self.channels[channel_index].values
+            values = channel._masked_values()
             points = [axis.points for axis in self.axes]
             xi = tuple(np.meshgrid(*points, indexing='ij'))
             # 'undo' gridding
@@ -957,8 +1560,14 @@ class Data:
             # grid data wants tuples
             tup = tuple([arr[i] for i in range(len(arr)-1)])
             # grid data
-            out = griddata(tup, arr[-1], xi, method=method, fill_value=fill_value)
+            if blocks is not None and method == 'linear':
+                out = wt_kit.interpolate_blocked(tup, [arr[-1]], points,
+                                                 blocks=blocks, fill_value=fill_value,
+                                                 workers=workers)[0]
+            else:
+                out = griddata(tup, arr[-1], xi, method=method, fill_value=fill_value)
             self.channels[channel_index].values = out
+            self.channels[channel_index].mask = None
             self.channels[channel_index]._update()
         # print
         if verbose:
@@ -975,6 +1584,7 @@ class Data:
         info['version'] = self.__version__
         return info
 
+    @_journaled(channels='channel', inverse='values')
     def level(self, channel, axis, npts, verbose=True):
         """
         For a channel, subtract the average value of several points at the edge
@@ -1015,20 +1625,16 @@ class Data:
         # level ---------------------------------------------------------------
         channel = self.channels[channel_index]
         values = channel.values
-        # transpose so the axis of interest is last
-        transpose_order = range(len(values.shape))
-        transpose_order = [len(values.shape)-1 if i==axis_index else i for i in transpose_order] #replace axis_index with zero
-        transpose_order[len(values.shape)-1] = axis_index
-        values = values.transpose(transpose_order)
+        # average of each slice along axis
+        sample = np.arange(values.shape[axis_index])
+        if npts > 0:
+            sample = sample[:npts]
+        elif npts < 0:
+            sample = sample[npts:]
+        offset = np.nanmean(np.take(values, sample, axis=axis_index), axis=axis_index, keepdims=True)
         # subtract
-        for index in np.ndindex(values[..., 0].shape):
-            if npts > 0:
-                offset = np.nanmean(values[index][:npts])
-            elif npts < 0:
-                offset = np.nanmean(values[index][npts:])
-            values[index] = values[index] - offset
-        # transpose back
-        values = values.transpose(transpose_order)
+        self._journal_inverse(channel, 'affine', (offset, 1.))
+        values -= offset
         # return
         channel.values = values
         channel.znull = 0.
@@ -1043,6 +1649,7 @@ class Data:
                 points = axis.points[npts:]
             print('channel', channel.name, 'offset by', axis.name, 'between', int(points.min()), 'and', int(points.max()), axis.units)
 
+    @_journaled(channels='all')
     def m(self, abs_data, channel=0, this_exp='TG',
           indices=None, m=None,
           bounds_error=True, verbose=True):
@@ -1131,6 +1738,7 @@ class Data:
                 print('{0} label_seed not found'.format(indi))
         return
 
+    @_journaled(channels='all')
     def map_axis(self, axis, points, input_units='same', verbose=True):
         '''
         Map points of an axis to new points using linear interpolation. Out-
@@ -1172,12 +1780,14 @@ class Data:
         new_points = [a.points if a is not axis else points for a in self.axes]
         if len(self.axes) == 1:
             for channel in self.channels:
-                function = scipy.interpolate.interp1d(self.axes[0].points, channel.values)
+                function = scipy.interpolate.interp1d(self.axes[0].points, channel._masked_values())
                 channel.values = function(new_points[0])
+                channel.mask = None
         else:
             xi = tuple(np.meshgrid(*new_points, indexing='ij'))
             for channel in self.channels:
-                values = channel.values
+                values = channel._masked_values()
+                channel.mask = None
                 channel.values = scipy.interpolate.interpn(old_points, values, xi,
                                                            method='linear',
                                                            bounds_error=False,
@@ -1190,6 +1800,7 @@ class Data:
         axis.points = points
         self._update()
 
+    @_journaled(channels='channel', inverse='values')
     def normalize(self, channel=0, axis=None):
         '''
         Normalize data in given channel so that null=0 and zmax=1.
@@ -1221,11 +1832,13 @@ class Data:
                 axis = [axis]
             axis = [process(i) for i in axis]
         # call normalize on channel
+        self._journal_inverse(channel, 'affine', channel._normalization(axis=axis))
         channel.normalize(axis=axis)
 
+    @_journaled(channels='all')
     def offset(self, points, offsets, along, offset_axis,
                units='same', offset_units='same', mode='valid',
-               method='linear', verbose=True):
+               method='linear', blocks=None, workers=1, verbose=True):
         '''
         Offset one axis based on another axis' values. Useful for correcting
         instrumental artifacts such as zerotune.
@@ -1251,6 +1864,12 @@ class Data:
             The interpolation method. Note that cubic interpolation is only
             possible for 1D and 2D data. See `griddata <http://docs.scipy.org/doc/scipy/reference/generated/scipy.interpolate.griddata.html>`_
             for more information. Default is linear.
+        blocks : int or list of int (optional)
+            Number of blocks along each axis. If given (linear method only),
+            the new grid is interpolated block by block, see
+            kit.interpolate_blocked. Default is None (global interpolation).
+        workers : int (optional)
+            Number of processes used for blocked interpolation. Default is 1.
         verbose : bool (optional)
             Toggle talkback. Default is True.
 
@@ -1345,7 +1964,8 @@ class Data:
             arr = np.zeros((len(self.axes)+1, channel.values.size))
             for i in range(len(self.axes)):
                 arr[i] = xi[i].flatten()
-            arr[-1] = channel.values.flatten()
+            arr[-1] = channel._masked_values().flatten()
+            channel.mask = None
 
             # do corrections
             corrections = list(corrections)
@@ -1355,8 +1975,13 @@ class Data:
             # grid data
             tup = tuple([arr[i] for i in range(len(arr)-1)])
             # note that rescale is crucial in this operation
-            out = griddata(tup, arr[-1], new_xi, method=method,
-                           fill_value=np.nan, rescale=True)
+            if blocks is not None and method == 'linear':
+                out = wt_kit.interpolate_blocked(tup, [arr[-1]], new_points,
+                                                 blocks=blocks, rescale=True,
+                                                 workers=workers)[0]
+            else:
+                out = griddata(tup, arr[-1], new_xi, method=method,
+                               fill_value=np.nan, rescale=True)
             channel.values = out
             channel._update()
 
@@ -1366,6 +1991,107 @@ class Data:
         self.transpose(transpose_order, verbose=False)
         self._update()
 
+    def peaks(self, axes=None, k=1, channels=None, kind='max', refine=False):
+        '''
+        Find the k largest (or smallest) values of each channel within every
+        slice spanned by the given axes, ignoring nans.
+
+        Parameters
+        ----------
+        axes : list of int or str (optional)
+            Axes to search along. Every combination of the remaining axes
+            is an independent slice. If None, all axes are searched, giving
+            the global extrema. Default is None.
+        k : int (optional)
+            Number of extrema per slice, sorted from most to least extreme.
+            Default is 1.
+        channels : list of int or str (optional)
+            Channels to search. If None, all channels. Default is None.
+        kind : {'max', 'min'} (optional)
+            Search for maxima or minima. Default is max.
+        refine : bool (optional)
+            Toggle sub-pixel refinement by fitting a parabola through each
+            extremum and its neighbors along every searched axis. Default is
+            False.
+
+        Returns
+        -------
+        OrderedDict
+            Keys are channel names, values are tuples (coordinates, values).
+            coordinates has shape (remaining shape) + (k, len(axes)), in
+            axis units. values has shape (remaining shape) + (k,). Slices
+            with fewer than k valid points are padded with nans.
+
+        See Also
+        --------
+        get_zenith
+        get_nadir
+        '''
+        # axes ----------------------------------------------------------------
+        if axes is None:
+            axes = list(range(len(self.axes)))
+        axes = [self.axis_names.index(a) if isinstance(a, string_type) else int(a) for a in axes]
+        others = [i for i in range(len(self.axes)) if i not in axes]
+        other_shape = tuple(self.shape[i] for i in others)
+        search_shape = tuple(self.shape[i] for i in axes)
+        M = int(np.prod(other_shape))
+        S = int(np.prod(search_shape))
+        k = min(int(k), S)
+        # channels ------------------------------------------------------------
+        if channels is None:
+            channels = list(self.channels)
+        else:
+            channels = [self.channels[self.channel_names.index(c)] if isinstance(c, string_type) else self.channels[c] for c in channels]
+        # stack as (channel, slice, searched point), maxima are always sought
+        order = others + axes
+        arr = np.array([np.transpose(c.values, order) for c in channels], dtype=float)
+        arr = arr.reshape(len(channels), M, S)
+        if kind == 'min':
+            arr *= -1
+        elif kind != 'max':
+            raise KeyError('kind must be one of {max, min}')
+        search = np.where(np.isnan(arr), -np.inf, arr)
+        # find ----------------------------------------------------------------
+        if k == 1:
+            idx = np.argmax(search, axis=-1)[..., None]
+        else:
+            idx = np.argpartition(-search, k-1, axis=-1)[..., :k]
+            top = np.take_along_axis(search, idx, axis=-1)
+            idx = np.take_along_axis(idx, np.argsort(-top, axis=-1, kind='mergesort'), axis=-1)
+        values = np.take_along_axis(search, idx, axis=-1)
+        valid = np.isfinite(values)
+        sub = np.unravel_index(idx, search_shape)  # index along each searched axis
+        # coordinates ---------------------------------------------------------
+        coordinates = np.empty(idx.shape + (len(axes),))
+        peak = values.copy()
+        strides = np.cumprod((1,) + search_shape[::-1])[:-1][::-1]
+        for j, (a, i) in enumerate(zip(axes, sub)):
+            points = self.axes[a].points
+            position = i.astype(float)
+            if refine and points.size > 2:
+                inner = (i > 0) & (i < points.size - 1)
+                below = np.take_along_axis(search, np.where(inner, idx - strides[j], idx), axis=-1)
+                above = np.take_along_axis(search, np.where(inner, idx + strides[j], idx), axis=-1)
+                with np.errstate(invalid='ignore', divide='ignore'):
+                    curvature = below - 2 * peak + above
+                    delta = 0.5 * (below - above) / curvature
+                ok = inner & np.isfinite(delta) & (curvature < 0)
+                delta = np.where(ok, np.clip(delta, -0.5, 0.5), 0.)
+                position += delta
+                values = values - np.where(ok, 0.25 * (below - above) * delta, 0.)
+            coordinates[..., j] = np.interp(position, np.arange(points.size), points)
+        if kind == 'min':
+            values = -values
+        values[~valid] = np.nan
+        coordinates[~valid] = np.nan
+        # package -------------------------------------------------------------
+        out = collections.OrderedDict()
+        for c, coords, vals in zip(channels, coordinates, values):
+            out[c.name] = (coords.reshape(other_shape + (k, len(axes))),
+                           vals.reshape(other_shape + (k,)))
+        return out
+
+    @_journaled()
     def remove_channel(self, channel):
         '''
         Remove channel from data.
@@ -1387,19 +2113,53 @@ class Data:
         # finish
         self._update()
 
+    @property
+    def journal(self):
+        '''
+        List of (method, parameters) for all operations that can be undone,
+        oldest first.
+        '''
+        return [(r['method'], r['parameters']) for r in getattr(self, '_journal', [])]
+
     def revert(self):
         '''
-        Revert this data object back to its original state.
+        Revert this data object back to its original state by undoing every
+        operation in the journal.
+
+        The journal holds at most Data.journal_length operations. If older
+        operations were dropped, the data object is reverted to its state
+        after them and a JournalTruncatedWarning is issued. Changes made by
+        writing directly into channel values are not journaled and cannot be
+        reverted.
+
+        See Also
+        --------
+        undo
+            Undo only the most recent operations.
+        '''
+        self.undo(len(getattr(self, '_journal', [])))
+        dropped = getattr(self, '_journal_dropped', 0)
+        if dropped:
+            wt_exceptions.JournalTruncatedWarning.warn(dropped, self.journal_length)
+
+    def undo(self, n=1):
         '''
-        for attribute_name in dir(self):
-            if attribute_name not in ['_original'] + wt_kit.get_methods(self):
-                # if attribute does not exist in original, delete it
-                try:
-                    original_attribute = getattr(self._original, attribute_name)
-                    setattr(self, attribute_name, original_attribute)
-                except AttributeError:
-                    delattr(self, attribute_name)
-        self._update()
+        Undo the last n operations recorded in the journal.
+
+        Parameters
+        ----------
+        n : int (optional)
+            Number of operations to undo. Default is 1.
+        '''
+        journal = getattr(self, '_journal', [])
+        if n > len(journal):
+            raise IndexError('cannot undo {0} operations, only {1} in journal'.format(n, len(journal)))
+        self._journal_depth = getattr(self, '_journal_depth', 0) + 1
+        try:
+            for _ in range(n):
+                self._journal_undo(journal.pop())
+        finally:
+            self._journal_depth -= 1
 
     def save(self, filepath=None, verbose=True):
         '''
@@ -1418,7 +2178,7 @@ class Data:
         Returns
         -------
         str
-            The filepath of the saved pickle.
+            The filepath of the saved pickle. The journal is not saved.
 
         See Also
         --------
@@ -1437,6 +2197,7 @@ class Data:
             print('data saved at', filepath)
         return filepath
 
+    @_journaled(channels='channel', inverse='values')
     def scale(self, channel=0, kind='amplitude', verbose=True):
         '''
         Scale a channel.
@@ -1459,6 +2220,12 @@ class Data:
             print('channel type', type(channel), 'not valid')
         channel = self.channels[channel_index]
         # do scaling
+        if kind in ['amp', 'amplitude']:
+            self._journal_inverse(channel, 'amplitude')
+        elif kind in ['log']:
+            self._journal_inverse(channel, 'log')
+        elif kind in ['invert']:
+            self._journal_inverse(channel, 'affine', (0., -1.))
         if kind in ['amp', 'amplitude']:
             channel_data = channel.values
             channel_data_abs = np.sqrt(np.abs(channel_data))
@@ -1472,19 +2239,55 @@ class Data:
             channel.values *= -1.
         channel._update()
 
+    @_journaled(channels='all')
+    def share_mask(self):
+        '''
+        Give all channels a single, shared validity mask. A point is valid
+        only if it is valid in every channel (not nan, not masked).
+
+        Unlike share_nans, channel values are not changed.
+
+        Returns
+        -------
+        Mask
+            The shared mask, also accessible as ``data.mask``.
+        '''
+        valid = np.ones(self.shape, dtype=bool)
+        for channel in self.channels:
+            valid &= channel.valid
+        mask = Mask(valid)
+        for channel in self.channels:
+            channel.mask = mask
+            channel._update()
+        return mask
+
+    @_journaled(channels='all')
     def share_nans(self):
         '''
-        Share not-a-numbers between all channels. If any channel is nan at a
-        given index, all channels will be nan at that index after this
-        operation.
+        Share not-a-numbers between all channels. If any channel is nan (or
+        inf) at a given index, all channels will be nan at that index after
+        this operation.
+
+        The union of nans is found in a single pass and written into the
+        channel arrays in place, without changing their dtype.
+
+        Returns
+        -------
+        boolean array
+            True where any channel is nan or inf.
 
-        Uses the share_nans method found in wt.kit.
+        See Also
+        --------
+        kit.share_nans
         '''
         arrs = [c.values for c in self.channels]
-        outs = wt_kit.share_nans(arrs)
-        for c, a, in zip(self.channels, outs):
-            c.values = a
+        mask = wt_kit.nan_mask(arrs, infs=True)
+        wt_kit.share_nans(arrs, mask=mask, inplace=True)
+        for c in self.channels:
+            c._update()
+        return mask
 
+    @_journaled(channels='channel')
     def smooth(self, factors, channel=None, verbose=True):
         '''
         Smooth a channel using an n-dimenional `kaiser window <https://en.wikipedia.org/wiki/Kaiser_window>`_.
@@ -1636,6 +2439,7 @@ class Data:
             # channels
             for channel in new_data.channels:
                 channel.values = channel.values[start:stop]
+            new_data._transform_masks(lambda valid: valid[start:stop])
             # transpose out
             new_data.transpose(transpose_order, verbose=False)
             outs.append(new_data)
@@ -1657,9 +2461,11 @@ class Data:
                 shape = [i for i in new_data.channels[0].values.shape if not i == 1]
                 for channel in new_data.channels:
                     channel.values.shape = shape
+                new_data._transform_masks(lambda valid: valid.reshape(shape))
                 new_data.shape = shape
         return outs
 
+    @_journaled(channels='channel')
     def subtract(self, subtrahend, channel=0, subtrahend_channel=0):
         '''
         Subtract a given channel by another data object. Subtrahend smay be self.
@@ -1717,6 +2523,7 @@ class Data:
         # transpose out
         self.transpose(transpose_order, verbose=False)
 
+    @_journaled(channels='channel')
     def trim(self, channel, **kwargs):
         '''
         Wrapper method for ``Channel.trim``.
@@ -1764,6 +2571,7 @@ class Data:
         # possibly use to plot vs constants?
         print('not yet implemented.')
 
+    @_journaled(inverse='transpose')
     def transpose(self, axes=None, verbose=True):
         '''
         Transpose the dataset.
@@ -1784,10 +2592,12 @@ class Data:
         self.axis_names = [self.axis_names[i] for i in axes]
         for channel in self.channels:
             channel.values = np.transpose(channel.values, axes=axes)
+        self._transform_masks(lambda valid: np.transpose(valid, axes=axes))
         if verbose:
             print('data transposed to', self.axis_names)
         self.shape = self.channels[0].values.shape
 
+    @_journaled(channels='all')
     def zoom(self, factor, order=1, verbose=True):
         '''
         Zoom the data array using spline interpolation of the requested
@@ -1812,14 +2622,254 @@ class Data:
                                                            order=order)
         # channels
         for channel in self.channels:
-            channel.values = scipy.ndimage.interpolation.zoom(channel.values,
+            channel.values = scipy.ndimage.interpolation.zoom(channel._masked_values(),
                                                               factor,
                                                               order=order)
+            channel.mask = None
         # return
         if verbose:
             print('data zoomed to new shape:', self.channels[0].values.shape)
 
 
+class Mask:
+
+    def __init__(self, valid):
+        '''
+        Compact, immutable validity mask.
+
+        Validity is stored as packed bits (one bit per point), so a single
+        mask can cheaply be shared by all channels of a data object instead
+        of encoding missing points as nans or numpy masked arrays.
+
+        Parameters
+        ----------
+        valid : boolean array-like
+            True where points are valid.
+        '''
+        valid = np.asarray(valid, dtype=bool)
+        self.shape = valid.shape
+        self.size = valid.size
+        self._bits = np.packbits(valid.ravel())
+        self.count = int(np.count_nonzero(valid))
+
+    def __and__(self, other):
+        if isinstance(other, Mask):
+            other = other.valid
+        return Mask(self.valid & other)
+
+    def __repr__(self):
+        return 'WrightTools.data.Mask object {0} ({1} of {2} valid) at {3}'.format(self.shape, self.count, self.size, str(id(self)))
+
+    def _assign(self, indicies, valid):
+        '''
+        Set the validity of some points in place, touching only their bits.
+        Masks are otherwise immutable, this is for the object filling a mask
+        while it is being acquired (PyCMDSFollower).
+
+        Parameters
+        ----------
+        indicies : tuple of 1D int arrays
+            Indicies of the points, one array per dimension. The last
+            occurrence of repeated points wins.
+        valid : 1D boolean array
+            Validity of each point.
+        '''
+        flat = np.ravel_multi_index(indicies, self.shape)[::-1]
+        flat, first = np.unique(flat, return_index=True)
+        valid = np.asarray(valid, dtype=bool)[::-1][first]
+        byte = flat >> 3
+        bit = (np.uint8(128) >> (flat & 7).astype(np.uint8)).astype(np.uint8)
+        was = (self._bits[byte] & bit) > 0
+        self.count += int(np.count_nonzero(valid)) - int(np.count_nonzero(was))
+        np.bitwise_and.at(self._bits, byte, ~bit)
+        np.bitwise_or.at(self._bits, byte[valid], bit[valid])
+
+    @property
+    def invalid(self):
+        return ~self.valid
+
+    @property
+    def valid(self):
+        '''
+        Boolean array, True where points are valid.
+        '''
+        valid = np.unpackbits(self._bits)[:self.size].astype(bool)
+        return valid.reshape(self.shape)
+
+
+
+class PyCMDSFollower:
+
+    def __init__(self, filepath, name=None, verbose=True):
+        '''
+        Follow a PyCMDS data file while it is being acquired.
+
+        Rows are parsed only once: each call to ``update`` reads the complete
+        lines appended since the last call (like read_array, skipping
+        comments and blank lines) and scatters them into a data object that
+        is preallocated on the full scan shape. Only the new points are
+        marked valid in the shared mask, and channel limits are widened
+        incrementally.
+
+        Parameters
+        ----------
+        filepath : str
+            The file to follow.
+        name : str or None (optional)
+            The name to be applied to the data object. If None, name is read
+            from file.
+        verbose : bool (optional)
+            Toggle talkback. Default is True.
+
+        Notes
+        -----
+        For scans with interpolated axes, each update regrids only the
+        region of the grid spanned by the new rows, from the rows recorded
+        within a margin around it (see kit.interpolate_blocked). Axes are
+        rescaled by their full extent, so that every region sees the same
+        geometry. Away from the edges of the data, where long thin simplices
+        may still change as rows arrive, the result equals regridding all
+        rows at once.
+        '''
+        self.filepath = filepath
+        self.verbose = verbose
+        self.headers = wt_kit.read_headers(filepath)
+        headers = self.headers
+        # name
+        if name is None:  # name not given in method arguments
+            name = headers['data name']
+        if name == '':  # name not given in PyCMDS
+            name = headers['data origin']
+        # axes
+        axes, self.interpolate_toggles = _PyCMDS_axes(headers)
+        shape = tuple([a.points.size for a in axes])
+        self.tols = [wt_kit.closest_pair(a.points, give='distance')/2. for a in axes]
+        # preallocate channels
+        self.channel_indicies = [i for i, kind in enumerate(headers['kind']) if kind == 'channel']
+        self.mask = Mask(np.zeros(shape, dtype=bool))
+        channels = []
+        for zi_index, arr_index in enumerate(self.channel_indicies):
+            channel = Channel(np.full(shape, np.nan), headers['units'][arr_index],
+                              znull=np.nan, zmin=np.nan, zmax=np.nan,
+                              signed=headers['channel signed'][zi_index],
+                              name=headers['name'][arr_index],
+                              label=headers['label'][arr_index], mask=self.mask)
+            channels.append(channel)
+        self.data = Data(axes, channels, [], name=name, source=filepath)
+        # file position
+        with open(filepath, 'rb') as f:
+            self.offset = wt_kit._data_offset(f)
+        self.num_columns = len(headers['name'])
+        self.rows = 0
+        self._arr = np.empty((self.num_columns, 0))  # rows of interpolated scans, grown by doubling
+        self._pending = None  # index region that could not be regridded yet
+        self.update()
+
+    def __repr__(self):
+        return 'WrightTools.data.PyCMDSFollower object \'{0}\' ({1} rows) at {2}'.format(self.filepath, self.rows, str(id(self)))
+
+    def _interpolate(self, arr):
+        # keep all rows, without copying them on every update
+        new = arr.shape[1]
+        if self.rows > self._arr.shape[1]:
+            grown = np.empty((self.num_columns, max(2 * self._arr.shape[1], self.rows)))
+            grown[:, :self.rows-new] = self._arr[:, :self.rows-new]
+            self._arr = grown
+        self._arr[:, self.rows-new:self.rows] = arr
+        axes = self.data.axes
+        shape = np.array(self.data.shape)
+        # grid region touched by the new rows, one point wider on each side
+        indicies = arr[:len(axes)].astype('int64')
+        low = np.maximum(indicies.min(axis=1) - 1, 0)
+        high = np.minimum(indicies.max(axis=1) + 1, shape - 1)
+        if self._pending is not None:
+            low = np.minimum(low, self._pending[0])
+            high = np.maximum(high, self._pending[1])
+        # rows within a margin of half the region around it
+        pad = 2 + (high - low) // 2
+        rows = self._arr[:, :self.rows]
+        indicies = rows[:len(axes)].astype('int64')
+        keep = np.all((indicies >= (low - pad)[:, None]) & (indicies <= (high + pad)[:, None]), axis=0)
+        rows = rows[:, keep]
+        indicies = indicies[:, keep].T
+        points_dict = _PyCMDS_points(self.headers, axes, rows, indicies,
+                                     self.tols, self.interpolate_toggles)
+        # rescale by full axis extents
+        all_points = []
+        grid = []
+        for axis, points, l, h in zip(axes, points_dict.values(), low, high):
+            offset = axis.points.min()
+            scale = axis.points.max() - offset
+            scale = scale if scale > 0 else 1.
+            all_points.append((points - offset) / scale)
+            grid.append((axis.points[l:h+1] - offset) / scale)
+        meshgrid = tuple(np.meshgrid(*grid, indexing='ij'))
+        try:
+            zis = wt_kit.interpolate_linear(tuple(all_points), rows[self.channel_indicies],
+                                            meshgrid)
+        except (ValueError, RuntimeError):
+            # not enough points to triangulate yet
+            self._pending = (low, high)
+            return
+        self._pending = None
+        region = tuple(slice(l, h+1) for l, h in zip(low, high))
+        for channel, zi in zip(self.data.channels, zis):
+            channel.values[region] = zi
+            channel.mask = None
+            # widen limits, fmin and fmax ignore nans
+            zmin = np.fmin.reduce(zi, axis=None)
+            channel.zmin = np.fmin(channel.zmin, zmin)
+            channel.zmax = np.fmax(channel.zmax, np.fmax.reduce(zi, axis=None))
+            channel.znull = np.fmin(channel.znull, zmin)
+
+    def update(self):
+        '''
+        Parse the complete lines appended to the file since the last update.
+
+        Returns
+        -------
+        int
+            The number of new rows.
+        '''
+        with open(self.filepath, 'rb') as f:
+            f.seek(self.offset)
+            chunk = f.read()
+        # only complete lines, the last one may still be being written
+        end = chunk.rfind(b'\n') + 1
+        chunk = chunk[:end]
+        self.offset += end
+        if chunk.strip():
+            arr = wt_kit._parse_chunk(chunk, self.num_columns, self.filepath).T
+        else:
+            arr = np.empty((self.num_columns, 0))
+        new = arr.shape[1]
+        if new == 0:
+            return 0
+        self.rows += new
+        if any(self.interpolate_toggles):
+            self._interpolate(arr)
+        else:
+            axes = self.data.axes
+            indicies = arr[:len(axes)].T.astype('int64')
+            # warns if recorded points exceed tolerance
+            _PyCMDS_points(self.headers, axes, arr, indicies, self.tols,
+                           self.interpolate_toggles)
+            grid_indicies = tuple(indicies.T)
+            values = arr[self.channel_indicies]
+            self.mask._assign(grid_indicies, ~wt_kit.nan_mask(values))
+            for channel, channel_values in zip(self.data.channels, values):
+                channel.values[grid_indicies] = channel_values
+                channel.mask = self.mask
+                # widen limits, fmin and fmax ignore nans
+                zmin = np.fmin.reduce(channel_values)
+                channel.zmin = np.fmin(channel.zmin, zmin)
+                channel.zmax = np.fmax(channel.zmax, np.fmax.reduce(channel_values))
+                channel.znull = np.fmin(channel.znull, zmin)
+        if self.verbose:
+            print('{0} new rows ({1} total)'.format(new, self.rows))
+        return new
+
+
 ### data creation methods #####################################################
 
 
@@ -1845,31 +2895,18 @@ def from_Cary50(filepath, verbose=True):
     filesuffix = os.path.basename(filepath).split('.')[-1]
     if filesuffix != 'csv':
         wt_exceptions.WrongFileTypeWarning.warn(filepath, 'csv')
-    # import array
-    lines = []
-    with open(filepath, 'r') as f:
-        header = f.readline()
-        units = f.readline()
-        while True:
-            line = f.readline()
-            if line == '\n' or line == '':
-                break
-            else:
-                clean = line[:-2]  # lines end with ',/n'
-                lines.append(np.fromstring(clean, sep=','))
-    header = header.split(',')
-    arr = np.array(lines).T
+    # import array (one pair of columns per scan)
+    scans = _spectra_table(filepath, **_spectra_formats['Cary50'])
     # chew through all scans
     datas = []
-    indicies = np.arange(len(header)//2)*2
-    for i in indicies:
-        axis = Axis(arr[i], 'nm', name='wm')
-        signal = Channel(arr[i+1], name='absorbance', label='absorbance', signed=False)
-        data = Data([axis], [signal], source='Cary 50', name=header[i])
+    for scan_name, x, y in scans:
+        axis = Axis(x, 'nm', name='wm')
+        signal = Channel(y, name='absorbance', label='absorbance', signed=False)
+        data = Data([axis], [signal], source='Cary 50', name=scan_name)
         datas.append(data)
     # finish
     if verbose:
-        print('{0} data objects successfully created from Cary 50 file:'.format(len(indicies)))
+        print('{0} data objects successfully created from Cary 50 file:'.format(len(datas)))
         for i, data in enumerate(datas):
             print('  {0}: {1}'.format(i, data.name))
     return datas
@@ -1936,10 +2973,17 @@ def from_rRaman(*args,**kwargs):
 
 def from_COLORS(filepaths, znull=None, name=None, cols=None, invert_d1=True,
                 color_steps_as='energy', ignore=['num', 'w3', 'wa', 'dref', 'm0', 'm1', 'm2', 'm3', 'm4', 'm5', 'm6'],
-                even=True, verbose=True):
+                even=True, grid_mode='interpolate', counts=False, workers=1,
+                verbose=True):
     '''
     filepaths may be string or list \n
-    color_steps_as one in 'energy', 'wavelength'
+    color_steps_as one in 'energy', 'wavelength' \n
+    grid_mode one in 'interpolate', 'snap' - snap averages rows onto the
+    nearest axis points, interpolating only cells without rows \n
+    counts toggles an extra 'counts' channel in snap mode, holding the number
+    of rows averaged into each point (zero where interpolated) \n
+    workers is the number of threads parsing files concurrently (or of
+    processes parsing a single file)
     '''
 
     # do we have a list of files or just one file? ----------------------------
@@ -1955,7 +2999,7 @@ def from_COLORS(filepaths, znull=None, name=None, cols=None, invert_d1=True,
     if cols:
         pass
     else:
-        num_cols = len(np.genfromtxt(file_example).T)
+        num_cols = wt_kit.count_columns(file_example)
         if num_cols in [28, 35]:
             cols = 'v2'
         elif num_cols in [20]:
@@ -2019,14 +3063,9 @@ def from_COLORS(filepaths, znull=None, name=None, cols=None, invert_d1=True,
 
     # import full array -------------------------------------------------------
 
-    for i in range(len(filepaths)):
-        dat = np.genfromtxt(filepaths[i]).T
-        if verbose:
-            print('dat imported:', dat.shape)
-        if i == 0:
-            arr = dat
-        else:
-            arr = np.append(arr, dat, axis = 1)
+    arr = wt_kit.read_arrays(filepaths, workers=workers).T
+    if verbose:
+        print('dat imported:', arr.shape)
 
     if invert_d1:
         idx = axes['d1'].file_idx
@@ -2045,34 +3084,14 @@ def from_COLORS(filepaths, znull=None, name=None, cols=None, invert_d1=True,
 
     for axis in scanned:
 
-        # generate lists from data
-        lis = sorted(arr[axis.file_idx])
-        tol = axis.tolerance
-
         # values are binned according to their averages now, so min and max
         #  are better represented
-        xstd = []
-        xs = []
-
-        # check to see if unique values are sufficiently unique
-        # deplete to list of values by finding points that are within
-        #  tolerance
-        while len(lis) > 0:
-            # find all the xi's that are like this one and group them
-            # after grouping, remove from the list
-            set_val = lis[0]
-            xi_lis = [xi for xi in lis if np.abs(set_val - xi) < tol]
-            # the complement of xi_lis is what remains of xlis, then
-            lis = [xi for xi in lis if not np.abs(xi_lis[0] - xi) < tol]
-            xi_lis_average = sum(xi_lis) / len(xi_lis)
-            xs.append(xi_lis_average)
-            xstdi = sum(np.abs(xi_lis - xi_lis_average)) / len(xi_lis)
-            xstd.append(xstdi)
+        xs, xstd, _ = wt_kit.cluster_1D(arr[axis.file_idx], axis.tolerance)
 
         # create uniformly spaced x and y lists for gridding
         # infinitesimal offset used to properly interpolate on bounds; can
         #   be a problem, especially for stepping axis
-        tol = sum(xstd) / len(xstd)
+        tol = xstd.mean()
         tol = max(tol, 0.3)
         if even:
             if axis.units_kind == 'energy' and color_steps_as == 'energy':
@@ -2108,12 +3127,24 @@ def from_COLORS(filepaths, znull=None, name=None, cols=None, invert_d1=True,
         # this took me many hours to figure out... - blaise
         xi = tuple(np.meshgrid(*[axis.points for axis in scanned], indexing = 'ij'))
 
-        for key in channels.keys():
+        zis = [arr[channel.file_idx] for channel in channels.values()]
+        fill_values = [min(zi) for zi in zis]
+        if grid_mode == 'snap':
+            grid = [axis.points for axis in scanned]
+            tolerance = [wt_kit.closest_pair(g, give='distance')/2. for g in grid]
+            grid_is, grid_counts = wt_kit.bin_onto_grid(points, zis, grid, tolerance,
+                                                        fill_value=fill_values)
+            if counts:
+                channels['counts'] = Channel(None, None, name='counts', label='counts')
+                grid_is.append(grid_counts.astype(float))
+        elif grid_mode == 'interpolate':
+            # one triangulation, shared by all channels
+            grid_is = wt_kit.interpolate_linear(points, zis, xi,
+                                                fill_value=fill_values)
+        else:
+            raise KeyError('grid_mode {} not recognized'.format(grid_mode))
+        for key, grid_i in zip(channels.keys(), grid_is):
             channel = channels[key]
-            zi = arr[channel.file_idx]
-            fill_value = min(zi)
-            grid_i = griddata(points, zi, xi,
-                              method='linear',fill_value=fill_value)
             channel.give_values(grid_i)
             if debug:
                 print(key)
@@ -2179,13 +3210,13 @@ def from_JASCO(filepath, name=None, kind='absorbance', verbose=True):
     if filesuffix != 'txt':
         wt_exceptions.WrongFileTypeWarning.warn(filepath, 'txt')
     # import array
-    arr = np.genfromtxt(filepath, skip_header=18).T
+    x, y = _spectra_table(filepath, **_spectra_formats['JASCO'])[0][1:]
     # name
     if not name:
         name = filepath
     # construct data
-    axis = Axis(arr[0], 'nm', name='wm')
-    signal = Channel(arr[1], kind, signed=False)
+    axis = Axis(x, 'nm', name='wm')
+    signal = Channel(y, kind, signed=False)
     data = Data([axis], [signal], source='JASCO', name=name)
     # finish
     if verbose:
@@ -2194,9 +3225,12 @@ def from_JASCO(filepath, name=None, kind='absorbance', verbose=True):
 
 
 def from_KENT(filepaths, znull=None, name=None, ignore=['wm'], use_norm=False,
-              delay_tolerance=0.1, frequency_tolerance=0.5, verbose=True):
+              delay_tolerance=0.1, frequency_tolerance=0.5, workers=1,
+              verbose=True):
     '''
     filepaths may be string or list \n
+    workers is the number of threads parsing files concurrently (or of
+    processes parsing a single file)
     '''
     # do we have a list of files or just one file? ----------------------------
     if type(filepaths) == list:
@@ -2218,14 +3252,9 @@ def from_KENT(filepaths, znull=None, name=None, ignore=['wm'], use_norm=False,
     channels['OPA2']   = Channel(None, 'V',  file_idx = 6, name = 'OPA2',  label_seed = ['1'])
     channels['OPA1']   = Channel(None, 'V',  file_idx = 7, name = 'OPA1',  label_seed = ['2'])
     # import full array -------------------------------------------------------
-    for i in range(len(filepaths)):
-        dat = np.genfromtxt(filepaths[i]).T
-        if verbose:
-            print('file imported:', dat.shape)
-        if i == 0:
-            arr = dat
-        else:
-            arr = np.append(arr, dat, axis = 1)
+    arr = wt_kit.read_arrays(filepaths, workers=workers).T
+    if verbose:
+        print('file imported:', arr.shape)
     # recognize dimensionality of data ----------------------------------------
     axes_discover = axes.copy()
     for key in ignore:
@@ -2234,31 +3263,13 @@ def from_KENT(filepaths, znull=None, name=None, ignore=['wm'], use_norm=False,
     scanned, constant = discover_dimensions(arr, axes_discover)
     # get axes points ---------------------------------------------------------
     for axis in scanned:
-        #generate lists from data
-        lis = sorted(arr[axis.file_idx])
-        tol = axis.tolerance
         # values are binned according to their averages now, so min and max
         #  are better represented
-        xstd = []
-        xs = []
-        # check to see if unique values are sufficiently unique
-        # deplete to list of values by finding points that are within
-        #  tolerance
-        while len(lis) > 0:
-            # find all the xi's that are like this one and group them
-            # after grouping, remove from the list
-            set_val = lis[0]
-            xi_lis = [xi for xi in lis if np.abs(set_val - xi) < tol]
-            # the complement of xi_lis is what remains of xlis, then
-            lis = [xi for xi in lis if not np.abs(xi_lis[0] - xi) < tol]
-            xi_lis_average = sum(xi_lis) / len(xi_lis)
-            xs.append(xi_lis_average)
-            xstdi = sum(np.abs(xi_lis - xi_lis_average)) / len(xi_lis)
-            xstd.append(xstdi)
+        xs, xstd, _ = wt_kit.cluster_1D(arr[axis.file_idx], axis.tolerance)
         # create uniformly spaced x and y lists for gridding
         # infinitesimal offset used to properly interpolate on bounds; can
         #   be a problem, especially for stepping axis
-        tol = sum(xstd) / len(xstd)
+        tol = xstd.mean()
         tol = max(tol, 1e-4)
         axis.points = np.linspace(min(xs)+tol, max(xs)-tol, num = len(xs))
     # grid data ---------------------------------------------------------------
@@ -2276,12 +3287,13 @@ def from_KENT(filepaths, znull=None, name=None, ignore=['wm'], use_norm=False,
         # all other dimensionalities
         points = tuple(arr[axis.file_idx] for axis in scanned)
         xi = tuple(np.meshgrid(*[axis.points for axis in scanned], indexing = 'ij'))
-        for key in channels.keys():
+        # one triangulation, shared by all channels
+        zis = [arr[channel.file_idx] for channel in channels.values()]
+        fill_values = [min(zi) for zi in zis]
+        grid_is = wt_kit.interpolate_linear(points, zis, xi,
+                                            fill_value=fill_values)
+        for key, grid_i in zip(channels.keys(), grid_is):
             channel = channels[key]
-            zi = arr[channel.file_idx]
-            fill_value = min(zi)
-            grid_i = griddata(points, zi, xi,
-                         method='linear',fill_value=fill_value)
             channel.give_values(grid_i)
             if debug:
                 print(key)
@@ -2404,41 +3416,15 @@ def from_pickle(filepath, verbose = True):
     return data
 
 
-def from_PyCMDS(filepath, name=None,
-                shots_processing_module='mean_and_std', verbose=True):
+def _PyCMDS_axes(headers):
     '''
-    Create a data object from a single PyCMDS output file.
-
-    Parameters
-    ----------
-    filepath : str
-        The file to load. Can accept .data, .fit, or .shots files.
-    name : str or None (optional)
-        The name to be applied to the new data object. If None, name is read
-        from file.
-    shots_processing_module : str (optional)
-        The module used to process .shots files, if provided. Must be the name
-        of a module in the shots_processing directory.
-    verbose : bool (optional)
-        Toggle talkback. Default is True.
+    Create the axes of a PyCMDS file from its headers.
 
     Returns
     -------
-    data
-        A Data instance.
+    tuple
+        (list of axes, list of interpolate toggles)
     '''
-    # header
-    headers = wt_kit.read_headers(filepath)
-    # name
-    if name is None:  # name not given in method arguments
-        data_name = headers['data name']
-    else:
-        data_name = name
-    if data_name == '':  # name not given in PyCMDS
-        data_name = headers['data origin']
-    # array
-    arr = np.genfromtxt(filepath).T
-    # get axes
     axes = []
     for name, identity, units in zip(headers['axis names'],
                                      headers['axis identities'],
@@ -2457,9 +3443,6 @@ def from_PyCMDS(filepath, name=None,
             kwargs['centers'] = headers[name + ' centers']
         axis = Axis(points, units, name=name, label_seed=label_seed, **kwargs)
         axes.append(axis)
-    # get indicies arrays
-    indicies = arr[:len(axes)].T
-    indicies = indicies.astype('int64')
     # get interpolation toggles
     if 'axis interpolate' in headers.keys():
         interpolate_toggles = headers['axis interpolate']
@@ -2467,100 +3450,225 @@ def from_PyCMDS(filepath, name=None,
         # old data files may not have interpolate toggles in headers
         # assume no interpolation, unless the axis is the array detector
         interpolate_toggles = [True if name == 'wa' else False for name in headers['axis names']]
-    # get assorted remaining things
+    return axes, interpolate_toggles
+
+
+def _PyCMDS_points(headers, axes, arr, indicies, tols, interpolate_toggles):
+    '''
+    Recorded axis coordinates of each row of a PyCMDS array, in axis units.
+    Coordinates of axes that are not interpolated are coerced onto the axis
+    points, with a warning if any exceed tolerance.
+
+    Returns
+    -------
+    collections.OrderedDict
+        Axis name to 1D array, one point per row.
+    '''
     shape = tuple([a.points.size for a in axes])
-    tols = [wt_kit.closest_pair(a.points, give='distance')/2. for a in axes]
-    # prepare points for interpolation
     points_dict = collections.OrderedDict()
     for i, axis in enumerate(axes):
         # TODO: math and proper full recognition...
         axis_col_name = [name for name in headers['name'][::-1] if name in axis.identity][0]
         axis_index = headers['name'].index(axis_col_name)
-        # shape array acording to recorded coordinates
-        points = np.full(shape, np.nan)
-        for j, idx in enumerate(indicies):
-            lis = arr[axis_index]
-            points[tuple(idx)] = lis[j]
         # convert array
-        points = wt_units.converter(points, headers['units'][axis_index], axis.units)
+        points = wt_units.converter(arr[axis_index], headers['units'][axis_index], axis.units)
         # take case of scan about center
         if axis.identity[0] == 'D':
-            # transpose so this axis is first
-            transpose_order = list(range(len(axes)))
-            transpose_order.insert(0, transpose_order.pop(i))
-            points = points.transpose(transpose_order)
-            # subtract out centers
+            # centers are given over all other axes
             centers = np.array(headers[axis.name + ' centers'])
-            points -= centers
-            # transpose out
-            transpose_order = list(range(len(axes)))
-            transpose_order.insert(i, transpose_order.pop(0))
-            points = points.transpose(transpose_order)
-        points = points.flatten()
-        points_dict[axis.name] = points
+            others = [j for j in range(len(axes)) if not j == i]
+            centers = np.broadcast_to(centers, tuple(shape[j] for j in others))
+            points = points - centers[tuple(indicies[:, j] for j in others)]
         # check, coerce non-interpolated axes
         if not interpolate_toggles[i]:
-            for j, idx in enumerate(indicies):
-                actual = points[j]
-                expected = axis.points[idx[i]]
-                if abs(actual-expected) > tols[i]:
+            expected = axis.points[indicies[:, i]]
+            with np.errstate(invalid='ignore'):
+                if np.any(np.abs(points - expected) > tols[i]):
                     warnings.warn('at least one point exceded tolerance ' +
                                   'in axis {}'.format(axis.name))
-                points[j] = expected
-    all_points = tuple(points_dict.values())
-    # prepare values for interpolation
-    values_dict = collections.OrderedDict()
-    for i, kind in enumerate(headers['kind']):
-        if kind == 'channel':
-            values_dict[headers['name'][i]] = arr[i]
-    # create grid to interpolate onto
-    if len(axes) == 1:
-        meshgrid = tuple([axes[0].points])
+            points = expected
+        points_dict[axis.name] = points
+    return points_dict
+
+
+def _PyCMDS_shots_channels(filepath, headers, axes, shots_processing_module,
+                           chunksize=2**24):
+    '''
+    Reduce the shots of a PyCMDS .shots file into channels, streaming the
+    shot table in blocks of roughly chunksize bytes. Shots are binned by
+    their recorded indicies.
+
+    Returns
+    -------
+    list of channels
+        Channels sharing a mask of pixels with recorded shots.
+    '''
+    module = importlib.import_module(wt_shots_processing.__name__ + '.' + shots_processing_module)
+    shape = tuple([a.points.size for a in axes])
+    num_pixels = int(np.prod(shape))
+    state = module.initialize(headers['name'], headers['kind'], headers['units'], num_pixels)
+    for block in wt_kit.iter_array(filepath, num_columns=len(headers['name']),
+                                   chunksize=chunksize):
+        shots = block.T
+        indicies = tuple(shots[:len(axes)].astype('int64'))
+        pixels = np.ravel_multi_index(indicies, shape)
+        module.process(state, pixels, shots)
+    channels = []
+    for name, values, units, signed in module.finalize(state):
+        channel = Channel(values.reshape(shape), units, signed=signed, name=name)
+        channels.append(channel)
+    mask = Mask(~wt_kit.nan_mask([channel.values for channel in channels]))
+    for channel in channels:
+        channel.mask = mask
+    return channels
+
+
+def from_PyCMDS(filepath, name=None,
+                shots_processing_module='mean_and_std', grid_mode='interpolate',
+                counts=False, blocks=None, workers=1, verbose=True):
+    '''
+    Create a data object from a single PyCMDS output file.
+
+    Parameters
+    ----------
+    filepath : str
+        The file to load. Can accept .data, .fit, or .shots files. Shots are
+        streamed from file and binned by their recorded indicies, without
+        interpolation.
+    name : str or None (optional)
+        The name to be applied to the new data object. If None, name is read
+        from file.
+    shots_processing_module : str (optional)
+        The module used to process .shots files, if provided. Must be the name
+        of a module in the shots_processing directory. Default is
+        'mean_and_std'.
+    grid_mode : {'interpolate', 'snap'} (optional)
+        How rows are placed onto interpolated axes. 'interpolate' grids
+        linearly over all rows. 'snap' averages rows onto the nearest axis
+        points within half a step, interpolating only cells without rows.
+        Default is 'interpolate'.
+    counts : bool (optional)
+        Toggle an extra channel 'counts' in snap mode, holding the number of
+        rows averaged into each point (zero where interpolated). Default is
+        False.
+    blocks : int or list of int (optional)
+        Number of blocks along each axis. If given, interpolation is done
+        block by block, see kit.interpolate_blocked. Default is None
+        (global interpolation).
+    workers : int (optional)
+        Number of processes used to parse the file, and to interpolate
+        blocks. Default is 1.
+    verbose : bool (optional)
+        Toggle talkback. Default is True.
+
+    Returns
+    -------
+    data
+        A Data instance.
+    '''
+    # header
+    headers = wt_kit.read_headers(filepath)
+    # name
+    if name is None:  # name not given in method arguments
+        data_name = headers['data name']
     else:
-        meshgrid = tuple(np.meshgrid(*[a.points for a in axes], indexing='ij'))
-    if any(interpolate_toggles):
-        # create channels through linear interpolation
-        channels = []
-        for i in range(len(arr)):
-            if headers['kind'][i] == 'channel':
-                # unpack
-                units = headers['units'][i]
-                signed = headers['channel signed'][len(channels)]
-                name = headers['name'][i]
-                label = headers['label'][i]
-                # interpolate
-                values = values_dict[name]
-                zi = griddata(all_points, values, meshgrid, rescale=True,
-                              method='linear', fill_value=np.nan)
-                # assemble
-                channel = Channel(zi, units, signed=signed, name=name, label=label)
-                channels.append(channel)
+        data_name = name
+    if data_name == '':  # name not given in PyCMDS
+        data_name = headers['data origin']
+    if os.path.splitext(filepath)[1] == '.shots':
+        axes, interpolate_toggles = _PyCMDS_axes(headers)
+        channels = _PyCMDS_shots_channels(filepath, headers, axes,
+                                          shots_processing_module)
     else:
-        # if none of the axes are interpolated onto,
-        # simply fill zis based on recorded axis index
-        num_channels = headers['kind'].count('channel')
-        channel_indicies = [i for i, kind in enumerate(headers['kind']) if kind == 'channel']
-        zis = [np.full(shape, np.nan) for _ in range(num_channels)]
-        # iterate through each row of the array, filling zis
-        for i in range(len(arr[0])):
-            idx = tuple(indicies[i])  # yes, this MUST be a tuple >:(
-            for zi_index, arr_index in enumerate(channel_indicies):
-                zis[zi_index][idx] = arr[arr_index, i]
-        # assemble channels
-        channels = []
-        for zi_index, arr_index in zip(range(len(zis)), channel_indicies):
-            zi = zis[zi_index]
-            units = headers['units'][arr_index]
-            signed = headers['channel signed'][zi_index]
-            name = headers['name'][arr_index]
-            label = headers['label'][arr_index]
-            channel = Channel(zi, units, signed=signed, name=name, label=label)
-            channels.append(channel)
+        # array
+        arr = wt_kit.read_array(filepath, workers=workers).T
+        # get axes
+        axes, interpolate_toggles = _PyCMDS_axes(headers)
+        # get indicies arrays
+        indicies = arr[:len(axes)].T
+        indicies = indicies.astype('int64')
+        # get assorted remaining things
+        shape = tuple([a.points.size for a in axes])
+        tols = [wt_kit.closest_pair(a.points, give='distance')/2. for a in axes]
+        grid_indicies = tuple(indicies.T)  # yes, this MUST be a tuple >:(
+        # prepare points for interpolation
+        points_dict = _PyCMDS_points(headers, axes, arr, indicies, tols, interpolate_toggles)
+        all_points = tuple(points_dict.values())
+        # prepare values for interpolation
+        values_dict = collections.OrderedDict()
+        for i, kind in enumerate(headers['kind']):
+            if kind == 'channel':
+                values_dict[headers['name'][i]] = arr[i]
+        # create grid to interpolate onto
+        if len(axes) == 1:
+            meshgrid = tuple([axes[0].points])
+        else:
+            meshgrid = tuple(np.meshgrid(*[a.points for a in axes], indexing='ij'))
+        if any(interpolate_toggles):
+            if grid_mode == 'snap':
+                # bin onto axis points, interpolate empty cells only
+                zis, grid_counts = wt_kit.bin_onto_grid(all_points, list(values_dict.values()),
+                                                        [a.points for a in axes], tols)
+            elif grid_mode == 'interpolate' and blocks is not None:
+                # create channels through blocked linear interpolation
+                zis = wt_kit.interpolate_blocked(all_points, list(values_dict.values()),
+                                                 [a.points for a in axes], blocks=blocks,
+                                                 rescale=True, workers=workers)
+            elif grid_mode == 'interpolate':
+                # create channels through linear interpolation
+                # one triangulation, shared by all channels
+                zis = wt_kit.interpolate_linear(all_points, list(values_dict.values()),
+                                                meshgrid, rescale=True)
+            else:
+                raise KeyError('grid_mode {} not recognized'.format(grid_mode))
+            channels = []
+            for i in range(len(arr)):
+                if headers['kind'][i] == 'channel':
+                    # unpack
+                    units = headers['units'][i]
+                    signed = headers['channel signed'][len(channels)]
+                    name = headers['name'][i]
+                    label = headers['label'][i]
+                    zi = zis[len(channels)]
+                    # assemble
+                    channel = Channel(zi, units, signed=signed, name=name, label=label)
+                    channels.append(channel)
+            if grid_mode == 'snap' and counts:
+                channels.append(Channel(grid_counts.astype(float), None, signed=False,
+                                        name='counts', label='counts'))
+        else:
+            # if none of the axes are interpolated onto,
+            # simply fill zis based on recorded axis index
+            num_channels = headers['kind'].count('channel')
+            channel_indicies = [i for i, kind in enumerate(headers['kind']) if kind == 'channel']
+            # scatter all rows of all channels at once
+            zis = np.full((num_channels,) + shape, np.nan)
+            zis[(slice(None),) + grid_indicies] = arr[channel_indicies]
+            # points never recorded (and nans) are invalid in all channels
+            valid = np.zeros(shape, dtype=bool)
+            valid[grid_indicies] = True
+            valid &= ~wt_kit.nan_mask(zis)
+            mask = Mask(valid)
+            # assemble channels
+            channels = []
+            for zi_index, arr_index in zip(range(len(zis)), channel_indicies):
+                zi = zis[zi_index]
+                units = headers['units'][arr_index]
+                signed = headers['channel signed'][zi_index]
+                name = headers['name'][arr_index]
+                label = headers['label'][arr_index]
+                channel = Channel(zi, units, signed=signed, name=name, label=label,
+                                  mask=mask)
+                channels.append(channel)
     # get constants
     constants = []
-    for name, identity in zip(headers['constant names'], headers['constant identities']):
+    for i, (name, identity) in enumerate(zip(headers['constant names'],
+                                             headers['constant identities'])):
+        if name + ' points' in headers.keys():  # written by Data.export
+            constant = Axis(headers[name + ' points'], headers['constant units'][i],
+                            name=name, identity=identity)
+            constants.append(constant)
         # TODO: handle PyCMDS constants
-        pass
     # create data object
     data = Data(axes, channels, constants, name=data_name, source=filepath)
     # return
@@ -2579,13 +3687,10 @@ def from_scope(filepath, name=None, verbose=True):
     else:
         raise wt_exceptions.FileNotFound('{0}'.format(filepath))
     # import
-    skip_header = 14
-    skip_footer = 1
-    arr = np.genfromtxt(filepath, skip_header=skip_header,
-                        skip_footer=skip_footer, delimiter = '\t').T
+    x, y = _spectra_table(filepath, **_spectra_formats['scope'])[0][1:]
     # construct data
-    a = Axis(arr[0], 'nm', name = 'wm')
-    c = Channel(arr[1], name='intensity', signed=False)
+    a = Axis(x, 'nm', name = 'wm')
+    c = Channel(y, name='intensity', signed=False)
     data = Data([a], [c], source='scope', name=name)
     # finish
     return data
@@ -2614,12 +3719,12 @@ def from_shimadzu(filepath, name=None, verbose=True):
 
     # import data -------------------------------------------------------------
 
-    # now import file as a local var--18 lines are just txt and thus discarded
-    data = np.genfromtxt(filepath, skip_header=2, delimiter = ',').T
+    # header lines are just txt and thus discarded
+    x, y = _spectra_table(filepath, **_spectra_formats['shimadzu'])[0][1:]
 
     # construct data
-    x_axis = Axis(data[0], 'nm', name = 'wm')
-    signal = Channel(data[1], 'sig', file_idx = 1, signed = False)
+    x_axis = Axis(x, 'nm', name = 'wm')
+    signal = Channel(y, 'sig', file_idx = 1, signed = False)
     data = Data([x_axis], [signal], source='Shimadzu', name=name)
 
     # return ------------------------------------------------------------------
@@ -2627,6 +3732,157 @@ def from_shimadzu(filepath, name=None, verbose=True):
     return data
 
 
+def _spectra_table(filepath, skip_header=0, skip_footer=0, delimiter=None,
+                   name_row=None):
+    '''
+    Parse the numeric table of a spectrometer file in bulk, stopping at the
+    first blank line. Arguments are those of _spectra_formats.
+
+    Returns
+    -------
+    list of tuples
+        (name, x, y) for each spectrum in the file. Files with more than two
+        columns hold (x, y) pairs of columns.
+    '''
+    with open(filepath, 'r') as f:
+        lines = f.read().splitlines()
+    header = lines[name_row] if name_row is not None else ''
+    lines = lines[skip_header:len(lines)-skip_footer]
+    for i, line in enumerate(lines):
+        if line.strip() == '':
+            lines = lines[:i]
+            break
+    text = '\n'.join(lines)
+    if delimiter is not None:
+        text = text.replace(delimiter, ' ')
+    num_columns = len(text.split('\n', 1)[0].split())
+    arr = np.fromstring(text, sep=' ')
+    if arr.size == num_columns * len(lines):
+        arr = arr.reshape(len(lines), num_columns).T
+    else:
+        # ragged table (e.g. scans of different lengths), parse field by field
+        arr = np.genfromtxt(lines, delimiter=delimiter).T
+    # pair columns
+    names = [n.strip().strip('"') for n in header.split(delimiter)] if header else []
+    out = []
+    for i in range(0, len(arr) - 1, 2):
+        x, y = arr[i], arr[i+1]
+        keep = ~(np.isnan(x) | np.isnan(y))
+        name = names[i] if i < len(names) and names[i] else os.path.basename(filepath)
+        out.append((name, x[keep], y[keep]))
+    return out
+
+
+# kind: table layout, shared by from_spectra and the single file loaders
+# name_row is the line holding spectrum names (Cary 50 puts units on the next)
+_spectra_formats = collections.OrderedDict()
+_spectra_formats['Cary50'] = {'skip_header': 2, 'delimiter': ',', 'name_row': 0}
+_spectra_formats['JASCO'] = {'skip_header': 18}
+_spectra_formats['scope'] = {'skip_header': 14, 'skip_footer': 1, 'delimiter': '\t'}
+_spectra_formats['shimadzu'] = {'skip_header': 2, 'delimiter': ',', 'name_row': 0}
+_spectra_formats['Tensor27'] = {}
+_spectra_formats['text'] = {}
+
+# kind: (axis name, axis units, channel name, source)
+_spectra_kinds = collections.OrderedDict()
+_spectra_kinds['Cary50'] = ('wm', 'nm', 'absorbance', 'Cary 50')
+_spectra_kinds['JASCO'] = ('wm', 'nm', 'absorbance', 'JASCO')
+_spectra_kinds['scope'] = ('wm', 'nm', 'intensity', 'scope')
+_spectra_kinds['shimadzu'] = ('wm', 'nm', 'sig', 'Shimadzu')
+_spectra_kinds['Tensor27'] = ('w', 'wn', 'absorbance', 'Tensor 27')
+_spectra_kinds['text'] = ('wm', 'wn', 'signal', 'Brunold rRaman')
+
+
+def from_spectra(filepaths, kind, name=None, points=None, interpolate=False,
+                 index=None, index_name='index', index_units=None,
+                 workers=1, verbose=True):
+    '''
+    Create a single 2D data object (spectrum index, spectral axis) from many
+    1D spectra, e.g. a temperature or power series.
+
+    Parameters
+    ----------
+    filepaths : list of str
+        Paths of spectrometer files, in order. Files holding several spectra
+        (Cary 50) contribute all of them, in order.
+    kind : {'Cary50', 'JASCO', 'scope', 'shimadzu', 'Tensor27', 'text'}
+        Spectrometer file format.
+    name : str (optional)
+        Name of data object. If None, the name of the first file is used.
+        Default is None.
+    points : 1D array (optional)
+        Shared spectral axis points. If None, the points of the first
+        spectrum are used. Default is None.
+    interpolate : bool (optional)
+        Toggle linear interpolation of each spectrum onto the shared points.
+        If False, every spectrum must already be recorded on them (a
+        ValueError is raised otherwise). Points outside of a spectrum are
+        filled with nan. Default is False.
+    index : 1D array (optional)
+        Points of the spectrum index axis, e.g. temperatures. If None,
+        spectra are simply counted. Default is None.
+    index_name : str (optional)
+        Name of the spectrum index axis. Default is 'index'.
+    index_units : str (optional)
+        Units of the spectrum index axis. Default is None.
+    workers : int (optional)
+        Number of threads used to parse files. Default is 1.
+    verbose : bool (optional)
+        Toggle talkback. Default is True.
+
+    Returns
+    -------
+    data
+        New data object.
+    '''
+    if kind not in _spectra_kinds.keys():
+        raise KeyError('kind {} not recognized'.format(kind))
+    axis_name, axis_units, channel_name, source = _spectra_kinds[kind]
+    for filepath in filepaths:
+        if not os.path.isfile(filepath):
+            raise wt_exceptions.FileNotFound(path=filepath)
+    # parse
+    parse = functools.partial(_spectra_table, **_spectra_formats[kind])
+    if workers > 1 and len(filepaths) > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(int(workers))
+        try:
+            tables = pool.map(parse, filepaths)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        tables = [parse(filepath) for filepath in filepaths]
+    spectra = [spectrum for table in tables for spectrum in table]
+    # shared axis
+    if points is None:
+        points = spectra[0][1]
+    points = np.asarray(points, dtype=float)
+    # stack
+    values = np.empty((len(spectra), points.size))
+    for i, (spectrum_name, x, y) in enumerate(spectra):
+        if x.shape == points.shape and np.allclose(x, points):
+            values[i] = y
+        elif interpolate:
+            order = np.argsort(x)
+            values[i] = np.interp(points, x[order], y[order], left=np.nan, right=np.nan)
+        else:
+            raise ValueError('spectrum {0} ({1}) is not recorded on the shared points, use interpolate'.format(i, spectrum_name))
+    # construct data
+    if index is None:
+        index = np.arange(len(spectra))
+    if name is None:
+        name = os.path.basename(filepaths[0])
+    axes = [Axis(index, index_units, name=index_name),
+            Axis(points, axis_units, name=axis_name)]
+    channel = Channel(values, name=channel_name, label=channel_name, signed=False)
+    data = Data(axes, [channel], source=source, name=name)
+    # finish
+    if verbose:
+        print('data object of {0} spectra created from {1} files'.format(len(spectra), len(filepaths)))
+    return data
+
+
 def from_Tensor27(filepath, name=None, verbose=True):
     '''
     Create a data object from a Tensor27 FTIR file.
@@ -2653,13 +3909,13 @@ def from_Tensor27(filepath, name=None, verbose=True):
     if filesuffix != 'dpt':
         wt_exceptions.WrongFileTypeWarning.warn(filepath, 'dpt')
     # import array
-    arr = np.genfromtxt(filepath, skip_header=0).T
+    x, y = _spectra_table(filepath, **_spectra_formats['Tensor27'])[0][1:]
     # name
     if not name:
         name = os.path.basename(filepath)
     # construct data
-    axis = Axis(arr[0], 'wn', name='w')
-    signal = Channel(arr[1], name='absorbance', label='absorbance', signed=False)
+    axis = Axis(x, 'wn', name='w')
+    signal = Channel(y, name='absorbance', label='absorbance', signed=False)
     data = Data([axis], [signal], source='Tensor 27', name=name)
     # finish
     if verbose:
@@ -2824,18 +4080,13 @@ def discover_dimensions(arr, dimension_cols, verbose = True):
 
     # find
     d_equal = np.zeros((len(dims), len(dims)), dtype=bool)
-    d_equal[:, :] = True
-    for i in range(len(dims)):  # test
-        for j in range(len(dims)):  # against
-            for k in range(len(arr[0])):
-                upper_bound = arr[dims[i][0], k] + dims[i][1]
-                lower_bound = arr[dims[i][0], k] - dims[i][1]
-                test_point =  arr[dims[j][0], k]
-                if upper_bound > test_point > lower_bound:
-                    pass
-                else:
-                    d_equal[i, j] = False
-                    break
+    against = arr[[dim[0] for dim in dims]]
+    for i in range(len(dims)):  # test, against all dimensions at once
+        upper_bound = arr[dims[i][0]] + dims[i][1]
+        lower_bound = arr[dims[i][0]] - dims[i][1]
+        with np.errstate(invalid='ignore'):
+            within = (upper_bound > against) & (against > lower_bound)
+        d_equal[i] = within.all(axis=1)
     if debug:
         print(d_equal)
 
@@ -2886,14 +4137,14 @@ def discover_dimensions(arr, dimension_cols, verbose = True):
     first_change_indicies = []
     for axis in scanned:
         first_point = arr[axis[1], 0]
-        for i in range(len(arr[0])):
-            upper_bound = arr[axis[1], i] + axis[2]
-            lower_bound = arr[axis[1], i] - axis[2]
-            if upper_bound > first_point > lower_bound:
-                pass
-            else:
-                first_change_indicies.append(i)
-                break
+        upper_bound = arr[axis[1]] + axis[2]
+        lower_bound = arr[axis[1]] - axis[2]
+        with np.errstate(invalid='ignore'):
+            changed = ~((upper_bound > first_point) & (first_point > lower_bound))
+        if changed.any():
+            first_change_indicies.append(changed.argmax())
+        else:
+            first_change_indicies.append(changed.size)
     scanned_ordered = [scanned[i] for i in np.argsort(first_change_indicies)]
     scanned_ordered.reverse()
 
@@ -24,6 +24,14 @@ class FileNotFound(Exception):
 ### custom warnings ###########################################################
 
 
+class JournalTruncatedWarning(Warning):
+
+    def warn(dropped, journal_length):
+        message = 'the oldest {0} operations were dropped from the journal (Data.journal_length is {1}), '.format(dropped, journal_length)
+        message += 'data is only reverted to its state after them'
+        warnings.warn(message, JournalTruncatedWarning)
+
+
 class WrongFileTypeWarning(Warning):
     
     def warn(filepath, expected):
@@ -437,11 +437,13 @@ class Fitter:
         self.outs.channels = params_channels + self.outs.channels
         # do all fitting operations -------------------------------------------
         axes_points = [axis.points for axis in self.data.axes if axis.name in self.axes]
+        # masked points are written nan so that fits ignore them
+        channel_values = self.data.channels[channel_index]._masked_values()
         timer = wt_kit.Timer(verbose=False)
         with timer:
             for idx in np.ndindex(*self.fit_shape):
                 # do fit
-                values = self.data.channels[channel_index].values[idx]
+                values = channel_values[idx]
                 fit_args = [values] + axes_points
                 out = self.function.fit(*fit_args)
                 # fill outs
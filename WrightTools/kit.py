@@ -8,29 +8,41 @@ a collection of small, general purpose objects and methods
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 
+import io
 import os
 import re
 import ast
 import sys
-import copy
+import json
 import time
 import pytz
 import h5py
+import hashlib
 import warnings
 import dateutil
 import datetime
 import itertools
-import linecache
+import mmap
+import tempfile
+import contextlib
 import collections
 from time import clock
 
 from scipy import ndimage
+from scipy import sparse
+from scipy import spatial
 
 try:
     import configparser as configparser  # python 3
 except ImportError:
     import ConfigParser as configparser  # python 2
 
+try:
+    import fcntl  # posix
+except ImportError:
+    fcntl = None
+    import msvcrt  # windows
+
 import numpy as np
 
 from . import units  # legacy
@@ -294,11 +306,16 @@ def file_len(fname):
     Cheaply get the number of lines in a file. File is not entirely loaded 
     into memory.
     '''
-    # adapted from http://stackoverflow.com/questions/845058
-    with open(fname) as f:
-        for i, l in enumerate(f):
-            pass
-    return i + 1
+    # count newlines chunk by chunk, a last line may lack its newline
+    count = 0
+    last = b'\n'
+    with open(fname, 'rb') as f:
+        for chunk in iter(lambda: f.read(2**24), b''):
+            count += chunk.count(b'\n')
+            last = chunk[-1:]
+    if not last == b'\n':
+        count += 1
+    return count
 
 
 def find_name(fname, suffix):
@@ -331,15 +348,20 @@ def find_name(fname, suffix):
     return
     
     
+_not_whitespace = np.ones(256, dtype=bool)
+_not_whitespace[[9, 10, 11, 12, 13, 32]] = False
+
+
 class FileSlicer:
     
     def __init__(self, path, skip_headers=True, header_charachter='#'):
         '''
         Access groups of lines from a file quickly, without loading the entire
-        file into memory. Lines are accesed from Useful especially in cases where 
-        
-        Mostly a convinient wrapper around the standard library 'linecache'
-        module.
+        file into memory.
+
+        The file is memory mapped, and the byte offset of every line is
+        indexed once (vectorized, chunk by chunk). Groups of lines are then
+        parsed directly from the mapped bytes.
         
         Parameters
         ----------
@@ -353,21 +375,76 @@ class FileSlicer:
         '''
         self.path = path
         self.n = 0
-        self.length = file_len(path)
+        self._file = open(path, 'rb')
+        size = os.path.getsize(path)
+        if size:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            self._map = b''
+        # index line starts
+        starts = [np.zeros(1, dtype=np.int64)]
+        chunksize = 2**24
+        for offset in range(0, size, chunksize):
+            chunk = np.frombuffer(self._map[offset:offset+chunksize], dtype=np.uint8)
+            starts.append(np.flatnonzero(chunk == 10) + offset + 1)
+        starts = np.concatenate(starts)
+        if starts[-1] < size:
+            starts = np.append(starts, size)  # last line lacks its newline
+        self._starts = starts
+        self.length = starts.size - 1
         if skip_headers:
-            with open(path) as f:
-                while f.readline()[0] == header_charachter:
-                    self.n += 1
-                    
+            header = header_charachter.encode()
+            while self.n < self.length and self._map[starts[self.n]:starts[self.n]+1] == header:
+                self.n += 1
+
+    def _check(self, line_count):
+        if self.n + line_count > self.length:
+            raise IndexError('there are no more lines in the slicer: ' +
+                             '(file length {})'.format(self.length))
+
     def close(self):
         '''
-        Clear the cache, attempting to free as much memory as possible.
+        Release the memory map and the file.
         '''
-        linecache.clearcache()
+        if hasattr(self._map, 'close'):
+            self._map.close()
+        self._file.close()
     
     def get(self, line_count):
         '''
-        Get the next group of lines from the file.
+        Get the next group of lines from the file, parsed as numbers.
+        Blank lines count towards line_count but are left out of the array.
+        
+        Parameters
+        ----------
+        line_count : int
+            The number of lines to read from the file.
+            
+        Returns
+        -------
+        2D numpy.ndarray
+            Array of shape (non-blank lines, columns).
+        '''
+        self._check(line_count)
+        starts = self._starts[self.n:self.n+line_count+1]
+        chunk = self._map[starts[0]:starts[-1]]
+        # a line is blank if it holds nothing but whitespace
+        filled = _not_whitespace[np.frombuffer(chunk, dtype=np.uint8)]
+        rows = 0
+        if line_count:
+            rows = np.count_nonzero(np.add.reduceat(filled, starts[:-1] - starts[0]))
+        if rows:
+            arr = np.fromstring(chunk, sep=' ')
+            arr.shape = (rows, -1)
+        else:
+            arr = np.empty((0, 0))
+        # finish
+        self.n += line_count
+        return arr
+
+    def get_lines(self, line_count):
+        '''
+        Get the next group of lines from the file, as strings.
         
         Parameters
         ----------
@@ -379,15 +456,9 @@ class FileSlicer:
         list
             List of lines as strings.
         '''
-        # calculate indicies
-        start = self.n
-        stop = self.n + line_count
-        if stop > self.length:
-            raise IndexError('there are no more lines in the slicer: ' +
-                             '(file length {})'.format(self.length))
-        # get lines using list comprehension
-        # for some reason linecache is 1 indexed >:-(
-        out = [linecache.getline(self.path, i) for i in range(start+1, stop+1)]
+        self._check(line_count)
+        starts = self._starts[self.n:self.n+line_count+1]
+        out = [self._map[a:b].decode('utf-8') for a, b in zip(starts[:-1], starts[1:])]
         # finish
         self.n += line_count
         return out
@@ -401,9 +472,7 @@ class FileSlicer:
         line_count : int
             The number of lines to skip.
         '''
-        if self.n + line_count > self.length:
-            raise IndexError('there are no more lines in the slicer: ' +
-                             '(file length {})'.format(self.length))        
+        self._check(line_count)
         # finish
         self.n += line_count
 
@@ -576,6 +645,734 @@ def plot_dats(folder=None, transpose=True):
             pass
 
 
+def _user_cache_folder():
+    '''
+    Per-user cache folder of WrightTools, following platform conventions.
+    '''
+    if sys.platform.startswith('win'):
+        base = os.environ.get('LOCALAPPDATA', os.path.expanduser('~'))
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME', os.path.expanduser(os.path.join('~', '.cache')))
+    return os.path.join(base, 'WrightTools')
+
+
+class ParseCache:
+
+    def __init__(self, folder=None, max_bytes=2**30, hash=True,
+                 enabled=False):
+        '''
+        Binary sidecar cache of parsed numeric tables, so that repeat imports
+        of the same file are memory maps instead of text parsing.
+
+        Entries are .npy files in a single folder, indexed by absolute path
+        and parse parameters. An entry is only used while the size,
+        modification time and md5 hash of the original file are unchanged.
+        Least recently used entries are evicted to keep the cache below
+        max_bytes.
+
+        The index is only rewritten when entries are added or removed, under
+        a file lock and by atomic replacement, so that several processes can
+        share one cache folder.
+
+        The cache is off by default. The module level instance
+        ``parse_cache`` is used by read_array; turn it on with
+        ``wt.kit.parse_cache.enabled = True``.
+
+        Parameters
+        ----------
+        folder : str (optional)
+            Cache folder. If None, a folder 'parse' in the per-user cache
+            folder (e.g. ~/.cache/WrightTools/parse). Default is None.
+        max_bytes : int (optional)
+            Size limit of the cache. Default is 2**30 (1 GiB).
+        hash : bool (optional)
+            Toggle validation by md5 hash of file contents, in addition to
+            size and modification time. Hashing reads the whole file, but is
+            still much faster than parsing it. Default is True.
+        enabled : bool (optional)
+            Toggle cache. Default is False.
+        '''
+        if folder is None:
+            folder = os.path.join(_user_cache_folder(), 'parse')
+        self.folder = folder
+        self.max_bytes = max_bytes
+        self.hash = hash
+        self.enabled = enabled
+
+    def __repr__(self):
+        state = 'enabled' if self.enabled else 'disabled'
+        return 'WrightTools.kit.ParseCache object ({0}) at {1}'.format(state, self.folder)
+
+    def _drop(self, index, key):
+        index.pop(key, None)
+        try:
+            os.remove(os.path.join(self.folder, key + '.npy'))
+        except OSError:
+            pass
+
+    def _key(self, filepath, parameters):
+        string = repr((os.path.abspath(filepath), parameters))
+        return hashlib.md5(string.encode('utf-8')).hexdigest()
+
+    @contextlib.contextmanager
+    def _lock(self):
+        '''
+        Exclusive lock of the cache folder, between processes.
+        '''
+        if not os.path.isdir(self.folder):
+            os.makedirs(self.folder)
+        with open(os.path.join(self.folder, 'index.lock'), 'a+') as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _read_index(self):
+        try:
+            with open(os.path.join(self.folder, 'index.json'), 'r') as f:
+                return json.load(f)
+        except (IOError, OSError):
+            return {}
+        except ValueError:
+            # unreadable index, entries are treated as orphans (see _write_index)
+            warnings.warn('parse cache index {} is unreadable, starting over'.format(self.folder))
+            return {}
+
+    def _replace(self, source, destination):
+        if hasattr(os, 'replace'):  # python 3
+            os.replace(source, destination)
+        else:
+            if os.path.exists(destination) and sys.platform.startswith('win'):
+                os.remove(destination)
+            os.rename(source, destination)
+
+    def _signature(self, filepath):
+        stat = os.stat(filepath)
+        signature = {'size': stat.st_size, 'mtime': stat.st_mtime}
+        if self.hash:
+            md5 = hashlib.md5()
+            with open(filepath, 'rb') as f:
+                for chunk in iter(lambda: f.read(2**20), b''):
+                    md5.update(chunk)
+            signature['md5'] = md5.hexdigest()
+        return signature
+
+    def _write_index(self, index):
+        '''
+        Atomically replace the index, removing entry files that are not in
+        it. Must be called under _lock.
+        '''
+        for name in os.listdir(self.folder):
+            if name.endswith('.npy') and name[:-4] not in index:
+                self._drop(index, name[:-4])
+        handle, temp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+        with os.fdopen(handle, 'w') as f:
+            json.dump(index, f)
+        self._replace(temp, os.path.join(self.folder, 'index.json'))
+
+    def clear(self):
+        '''
+        Remove all entries.
+        '''
+        if not os.path.isdir(self.folder):
+            return
+        with self._lock():
+            self._write_index({})
+
+    def get(self, filepath, parameters):
+        '''
+        Get the cached array of a file, if valid.
+
+        Parameters
+        ----------
+        filepath : str
+            Path of original file.
+        parameters : object
+            Parse parameters (anything with a stable repr).
+
+        Returns
+        -------
+        numpy.memmap or None
+            Copy-on-write memory map of the array, or None if the cache is
+            disabled or holds no valid entry.
+        '''
+        if not self.enabled:
+            return None
+        key = self._key(filepath, parameters)
+        entry = self._read_index().get(key)
+        if entry is None:
+            return None
+        path = os.path.join(self.folder, key + '.npy')
+        try:
+            if not entry['signature'] == self._signature(filepath):
+                raise ValueError('{} changed'.format(filepath))
+            arr = np.load(path, mmap_mode='c')
+        except (IOError, OSError, ValueError):
+            with self._lock():
+                index = self._read_index()
+                if index.get(key) == entry:  # not replaced meanwhile
+                    self._drop(index, key)
+                    self._write_index(index)
+            return None
+        # mark as recently used, without touching the index
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return arr
+
+    def put(self, filepath, parameters, arr):
+        '''
+        Store the parsed array of a file, evicting least recently used
+        entries as needed.
+
+        Parameters
+        ----------
+        filepath : str
+            Path of original file.
+        parameters : object
+            Parse parameters (anything with a stable repr).
+        arr : numpy.ndarray
+            Parsed array.
+        '''
+        if not self.enabled or arr.size == 0:
+            return
+        key = self._key(filepath, parameters)
+        signature = self._signature(filepath)
+        with self._lock():
+            handle, temp = tempfile.mkstemp(dir=self.folder, suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                np.save(f, arr)
+            self._replace(temp, os.path.join(self.folder, key + '.npy'))
+            index = self._read_index()
+            index[key] = {'filepath': os.path.abspath(filepath),
+                          'signature': signature,
+                          'bytes': arr.nbytes}
+            # evict least recently used
+            def used(key):
+                try:
+                    return os.path.getmtime(os.path.join(self.folder, key + '.npy'))
+                except OSError:
+                    return 0
+            total = sum(entry['bytes'] for entry in index.values())
+            for k in sorted(index.keys(), key=used):
+                if total <= self.max_bytes:
+                    break
+                total -= index[k]['bytes']
+                self._drop(index, k)
+            self._write_index(index)
+
+
+parse_cache = ParseCache()
+
+
+def _data_offset(f, comment=b'#'):
+    '''
+    Advance open binary file f past its header lines, returning the byte
+    offset of the first data line.
+    '''
+    offset = f.tell()
+    while True:
+        line = f.readline()
+        if not line.startswith(comment):
+            break
+        offset = f.tell()
+    f.seek(offset)
+    return offset
+
+
+def _count_lines(f, start, stop, chunksize):
+    '''
+    Count newline characters of open binary file f between byte offsets.
+    '''
+    f.seek(start)
+    count = 0
+    while start < stop:
+        chunk = f.read(min(chunksize, stop - start))
+        if not chunk:
+            break
+        count += chunk.count(b'\n')
+        start += len(chunk)
+    return count
+
+
+# numpy 1.23 and newer parse text with a C implementation of loadtxt, which is
+# faster than np.fromstring and handles comments
+_loadtxt_compiled = tuple(int(i) for i in re.findall(r'\d+', np.__version__)[:2]) >= (1, 23)
+
+
+def _parse_chunk(chunk, num_columns, name, usecols=None):
+    '''
+    Parse whole lines of text (bytes) into an array of shape (rows, columns).
+    Comments (from '#' to the end of the line) and blank lines are skipped.
+    If usecols (list of int) is given, only those columns are returned, and
+    with np.loadtxt the others are never converted.
+    '''
+    if _loadtxt_compiled:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # chunks of comments only are empty
+            arr = np.loadtxt(io.BytesIO(chunk), ndmin=2, usecols=usecols)
+        if arr.size == 0:
+            return np.empty((0, num_columns if usecols is None else len(usecols)))
+        if usecols is None and arr.shape[1] != num_columns:
+            raise ValueError('{0} does not contain rows of {1} numbers'.format(name, num_columns))
+        return arr
+    if b'#' in chunk:
+        chunk = b'\n'.join(line.split(b'#', 1)[0] for line in chunk.split(b'\n'))
+    arr = np.fromstring(chunk, sep=' ')
+    if arr.size % num_columns:
+        raise ValueError('{0} does not contain rows of {1} numbers'.format(name, num_columns))
+    arr.shape = (-1, num_columns)
+    if usecols is not None:
+        arr = arr[:, usecols]
+    return arr
+
+
+def _usecols(columns, num_columns):
+    '''
+    Columns as a list for _parse_chunk, or None if all columns are used in
+    order.
+    '''
+    columns = np.atleast_1d(columns).tolist()
+    if columns == list(range(num_columns)):
+        return None
+    return columns
+
+
+def _iter_range(f, start, stop, num_columns, chunksize, usecols=None):
+    '''
+    Yield blocks of rows of open binary file f between byte offsets start
+    and stop (both at line boundaries), as arrays of shape (rows, columns),
+    see _parse_chunk.
+    '''
+    f.seek(start)
+    position = start
+    remainder = b''
+    while True:
+        data = f.read(min(chunksize, stop - position))
+        position += len(data)
+        if data:
+            chunk = remainder + data
+            end = chunk.rfind(b'\n') + 1
+            chunk, remainder = chunk[:end], chunk[end:]
+        else:
+            chunk, remainder = remainder, b''
+        if chunk.strip():
+            arr = _parse_chunk(chunk, num_columns, f.name, usecols)
+            if arr.size:
+                yield arr
+        if not data:
+            break
+
+
+def _parse_range(f, start, stop, num_columns, columns, chunksize, out):
+    '''
+    Parse rows of open binary file f between byte offsets start and stop
+    (both at line boundaries) into out, returning the number of rows.
+    '''
+    row = 0
+    usecols = _usecols(columns, num_columns)
+    for arr in _iter_range(f, start, stop, num_columns, chunksize, usecols):
+        out[row:row+arr.shape[0]] = arr
+        row += arr.shape[0]
+    return row
+
+
+_shared_buffer = None  # output of read_array, in its worker processes
+
+
+def _read_array_init(buffer):
+    global _shared_buffer
+    _shared_buffer = buffer
+
+
+def _read_array_range(args):
+    '''
+    Parse one byte range of a file straight into rows of the shared output
+    buffer, in a worker process of read_array. Returns the number of rows.
+    '''
+    filepath, start, stop, num_columns, columns, chunksize, row, lines = args
+    out = np.frombuffer(_shared_buffer, dtype=np.float64).reshape(-1, len(columns))
+    with open(filepath, 'rb') as f:
+        return _parse_range(f, start, stop, num_columns, columns, chunksize,
+                            out[row:row+lines])
+
+
+def count_columns(filepath):
+    '''
+    Count the columns of the numeric table in a 'Wright group formatted'
+    file, by looking at its first data row only.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of file.
+
+    Returns
+    -------
+    int
+        Number of columns.
+    '''
+    with open(filepath, 'rb') as f:
+        _data_offset(f)
+        line = f.readline()
+        while line and not line.strip():
+            line = f.readline()
+    return np.fromstring(line, sep=' ').size
+
+
+def read_array(filepath, usecols=None, num_columns=None, chunksize=2**24,
+               workers=1):
+    '''
+    Read the numeric table of a 'Wright group formatted' file: header lines
+    beginning with '#', followed by rows of whitespace-separated numbers.
+
+    The table is parsed in bulk, chunk by chunk, into a single preallocated
+    output array. This is much faster than np.genfromtxt. Comments and blank
+    lines are skipped anywhere in the table. With numpy 1.23 or newer each
+    chunk is parsed by the compiled np.loadtxt, which is about 1.3 times
+    faster than np.fromstring, otherwise by np.fromstring.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of file.
+    usecols : int or list of int (optional)
+        Columns to return. Columns not requested are never converted
+        (with np.loadtxt) or stored beyond the chunk being parsed. If None,
+        all columns are returned. Default is None.
+    num_columns : int (optional)
+        Number of columns in the file. If None, it is inferred from the
+        first data row. Default is None.
+    chunksize : int (optional)
+        Approximate number of bytes parsed at once. Default is 2**24.
+    workers : int (optional)
+        Number of processes. If greater than one, the file is split at line
+        boundaries into byte ranges that are parsed in parallel, directly
+        into an output buffer in shared memory. Only useful with as many
+        free cores. Default is 1.
+
+    Returns
+    -------
+    2D numpy.ndarray
+        Array of shape (rows, columns). Use ``.T`` for the column-first
+        layout returned by ``np.genfromtxt(filepath).T``. Binary files
+        (see data_to_binary) are returned as copy-on-write memory maps.
+
+    See Also
+    --------
+    read_headers
+    ParseCache
+    data_to_binary
+    '''
+    binary = _binary_layout(filepath)
+    if binary is not None:
+        arr = _map_binary(filepath, binary)
+        if usecols is not None:
+            arr = arr[:, usecols]
+        return arr
+    parameters = ('read_array', None if usecols is None else np.asarray(usecols).tolist(), num_columns)
+    cached = parse_cache.get(filepath, parameters)
+    if cached is not None:
+        return cached
+    if num_columns is None:
+        num_columns = count_columns(filepath)
+    columns = np.arange(num_columns)
+    if usecols is not None:
+        columns = columns[usecols]
+    single = np.ndim(columns) == 0
+    columns = np.atleast_1d(columns)
+    size = os.path.getsize(filepath)
+    with open(filepath, 'rb') as f:
+        offset = _data_offset(f)
+        # split into byte ranges at line boundaries
+        bounds = [offset]
+        for i in range(1, max(int(workers), 1)):
+            f.seek(max(offset + (size - offset) * i // workers - 1, bounds[-1]))
+            f.readline()
+            bounds.append(f.tell())
+        bounds.append(size)
+        bounds = sorted(set(bounds))
+        if len(bounds) < 3:
+            # number of rows cannot exceed number of lines
+            out = np.empty((_count_lines(f, offset, size, chunksize) + 1, columns.size))
+            rows = _parse_range(f, offset, size, num_columns, columns, chunksize, out)
+            out = out[:rows]
+        else:
+            import multiprocessing
+            # number of rows in each range cannot exceed number of lines
+            lines = [_count_lines(f, start, stop, chunksize) + 1 for start, stop in zip(bounds[:-1], bounds[1:])]
+            starts = np.cumsum([0] + lines)
+            buffer = multiprocessing.RawArray('d', int(starts[-1]) * columns.size)
+            jobs = [(filepath, start, stop, num_columns, columns, chunksize, row, num)
+                    for start, stop, row, num in zip(bounds[:-1], bounds[1:], starts, lines)]
+            pool = multiprocessing.Pool(len(jobs), _read_array_init, (buffer,))
+            try:
+                rows = pool.map(_read_array_range, jobs)
+            finally:
+                pool.close()
+                pool.join()
+            out = np.frombuffer(buffer, dtype=np.float64).reshape(-1, columns.size)
+            # close the gaps left by blank lines
+            row = 0
+            for start, num in zip(starts, rows):
+                out[row:row+num] = out[start:start+num]
+                row += num
+            out = out[:row]
+    if single:
+        out = out[:, 0]
+    parse_cache.put(filepath, parameters, out)
+    return out
+
+
+def iter_array(filepath, usecols=None, num_columns=None, chunksize=2**24):
+    '''
+    Iterate over the numeric table of a 'Wright group formatted' file in
+    blocks of rows, so that memory use is bounded by chunksize rather than
+    by the size of the file.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of file.
+    usecols : int or list of int (optional)
+        Columns to yield. If None, all columns are yielded. Default is None.
+    num_columns : int (optional)
+        Number of columns in the file. If None, it is inferred from the
+        first data row. Default is None.
+    chunksize : int (optional)
+        Approximate number of bytes parsed per block. Default is 2**24.
+
+    Yields
+    ------
+    2D numpy.ndarray
+        Block of shape (rows, columns).
+
+    See Also
+    --------
+    read_array
+    '''
+    if num_columns is None:
+        num_columns = count_columns(filepath)
+    columns = np.arange(num_columns)
+    if usecols is not None:
+        columns = columns[usecols]
+    single = np.ndim(columns) == 0
+    with open(filepath, 'rb') as f:
+        offset = _data_offset(f)
+        size = os.path.getsize(filepath)
+        for arr in _iter_range(f, offset, size, num_columns, chunksize,
+                               _usecols(columns, num_columns)):
+            if single:
+                yield arr[:, 0]
+            else:
+                yield arr
+
+
+def read_arrays(filepaths, usecols=None, chunksize=2**24, workers=1):
+    '''
+    Read and concatenate the numeric tables of several 'Wright group
+    formatted' files, in order.
+
+    Row counts are found first, so that the output is allocated once, and
+    each file is parsed directly into its own slice of the output.
+
+    Parameters
+    ----------
+    filepaths : list of str
+        Paths of files. All files must have the same columns.
+    usecols : int or list of int (optional)
+        Columns to return. If None, all columns are returned. Default is
+        None.
+    chunksize : int (optional)
+        Approximate number of bytes parsed at once. Default is 2**24.
+    workers : int (optional)
+        Number of threads parsing files concurrently. If only one file is
+        given, it is instead the number of processes passed to read_array.
+        Default is 1.
+
+    Returns
+    -------
+    2D numpy.ndarray
+        Array of shape (rows, columns).
+
+    See Also
+    --------
+    read_array
+    '''
+    if len(filepaths) == 1:
+        return read_array(filepaths[0], usecols=usecols, chunksize=chunksize,
+                          workers=workers)
+    if parse_cache.enabled or any(_binary_layout(filepath) for filepath in filepaths):
+        # each file is cached (or mapped) on its own
+        return np.concatenate([read_array(filepath, usecols=usecols, chunksize=chunksize)
+                               for filepath in filepaths])
+    num_columns = count_columns(filepaths[0])
+    columns = np.arange(num_columns)
+    if usecols is not None:
+        columns = columns[usecols]
+    single = np.ndim(columns) == 0
+    columns = np.atleast_1d(columns)
+    # pre-scan, number of rows cannot exceed number of lines
+    ranges = []
+    for filepath in filepaths:
+        with open(filepath, 'rb') as f:
+            offset = _data_offset(f)
+            size = os.path.getsize(filepath)
+            ranges.append((offset, size, _count_lines(f, offset, size, chunksize) + 1))
+    starts = np.cumsum([0] + [r[2] for r in ranges])
+    out = np.empty((starts[-1], columns.size))
+
+    def parse(i):
+        offset, size, lines = ranges[i]
+        with open(filepaths[i], 'rb') as f:
+            return _parse_range(f, offset, size, num_columns, columns, chunksize,
+                                out[starts[i]:starts[i]+lines])
+
+    if workers > 1:
+        from multiprocessing.pool import ThreadPool
+        pool = ThreadPool(int(workers))
+        try:
+            rows = pool.map(parse, range(len(filepaths)))
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        rows = [parse(i) for i in range(len(filepaths))]
+    # close the gaps left by blank lines
+    row = 0
+    for start, num in zip(starts, rows):
+        out[row:row+num] = out[start:start+num]
+        row += num
+    out = out[:row]
+    if single:
+        out = out[:, 0]
+    return out
+
+
+def _binary_layout(filepath):
+    '''
+    Layout of the binary block of a file, as a dictionary of headers
+    (offset, dtype, columns), or None for text files.
+    '''
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if not line.startswith(b'#'):
+                return None
+            if line.startswith(b'# binary offset:'):
+                break
+        else:
+            return None
+    headers = read_headers(filepath)
+    return {'offset': headers['binary offset'],
+            'dtype': headers['binary dtype'],
+            'columns': headers['binary columns']}
+
+
+def _map_binary(filepath, binary):
+    dtype = np.dtype(binary['dtype'])
+    size = os.path.getsize(filepath) - binary['offset']
+    rows = size // (dtype.itemsize * binary['columns'])
+    if rows == 0:
+        return np.empty((0, binary['columns']), dtype=dtype)
+    return np.memmap(filepath, dtype=dtype, mode='c', offset=binary['offset'],
+                     shape=(rows, binary['columns']))
+
+
+def binary_to_data(filepath, outpath=None, fmt='%.17g'):
+    '''
+    Convert a binary data file (see data_to_binary) back into the text
+    format.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of binary file.
+    outpath : str (optional)
+        Path of new text file. If None, the extension of filepath is
+        replaced with .data. Default is None.
+    fmt : str (optional)
+        Format of each number. The default is exact for 64 bit floats.
+
+    Returns
+    -------
+    str
+        Path of new text file.
+    '''
+    if outpath is None:
+        outpath = os.path.splitext(filepath)[0] + '.data'
+    headers = read_headers(filepath)
+    for key in ['binary dtype', 'binary columns', 'binary offset']:
+        headers.pop(key)
+    with TextWriter(outpath, headers, fmt=fmt) as writer:
+        writer.write(read_array(filepath))
+    return outpath
+
+
+def data_to_binary(filepath, outpath=None, chunksize=2**24):
+    '''
+    Convert a 'Wright group formatted' text data file into its binary
+    sibling: the same text headers, followed by the table as a raw,
+    little-endian float64 block in row-major order. The layout is recorded
+    in the last three headers ('binary dtype', 'binary columns' and
+    'binary offset', the byte position of the block).
+
+    Binary files are read transparently by read_array, and hence by
+    from_PyCMDS, as memory maps. The conversion streams the text file in
+    chunks, so memory use is bounded.
+
+    Parameters
+    ----------
+    filepath : str
+        Path of text file.
+    outpath : str (optional)
+        Path of new binary file. If None, the extension of filepath is
+        replaced with .bdata. Default is None.
+    chunksize : int (optional)
+        Approximate number of bytes parsed at once. Default is 2**24.
+
+    Returns
+    -------
+    str
+        Path of new binary file.
+
+    See Also
+    --------
+    binary_to_data
+    '''
+    if outpath is None:
+        outpath = os.path.splitext(filepath)[0] + '.bdata'
+    headers = read_headers(filepath)
+    num_columns = count_columns(filepath)
+    headers['binary dtype'] = '<f8'
+    headers['binary columns'] = num_columns
+    # offset is written into the headers themselves, align the block
+    offset = 0
+    while True:
+        headers['binary offset'] = offset
+        header = _headers_string(headers).encode('utf-8')
+        if len(header) <= offset:
+            break
+        offset = (len(header) // 64 + 1) * 64
+    with open(outpath, 'wb') as f:
+        f.write(header)
+        f.write(b'\n' * (offset - len(header)))
+        for arr in iter_array(filepath, num_columns=num_columns, chunksize=chunksize):
+            f.write(arr.astype('<f8').tobytes())
+    return outpath
+
+
 def read_data_column(path, name):
     """
     Read a named column of a PyCMDS data file as a single array.
@@ -594,24 +1391,183 @@ def read_data_column(path, name):
     """
     headers = read_headers(path)
     index = headers['name'].index(name)
-    arr = np.genfromtxt(path).T
-    return arr[index]
+    return read_array(path, usecols=index, num_columns=len(headers['name']))
 
 
-def read_h5(filepath):
+def read_data_columns(path, names):
+    """
+    Read several named columns of a PyCMDS data file in one pass.
+    
+    Parameters
+    ----------
+    path : string
+        Path of PyCMDS data file.
+    names : list of strings
+        Names of columns to read.
+    
+    Returns
+    -------
+    OrderedDict
+        Column name to 1D numpy.ndarray.
+
+    See Also
+    --------
+    read_data_column
+    """
+    headers = read_headers(path)
+    indicies = [headers['name'].index(name) for name in names]
+    arr = read_array(path, usecols=indicies, num_columns=len(headers['name']))
+    out = collections.OrderedDict()
+    for i, name in enumerate(names):
+        out[name] = arr[:, i]
+    return out
+
+
+class H5Appender:
+
+    def __init__(self, filepath, compression=None, level=None, shuffle=False,
+                 chunk_rows=1024):
+        '''
+        Stream rows into resizable datasets of an `HDF5 <https://www.hdfgroup.org/HDF5/doc/H5.intro.html>`_
+        file, without holding them in memory.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to HDF5 file, opened for appending.
+        compression : {None, 'lzf', 'gzip'} (optional)
+            Compression filter of new datasets. Default is None.
+        level : int (optional)
+            gzip compression level (0-9). Default is None (h5py default).
+        shuffle : bool (optional)
+            Toggle byte shuffle filter, which often improves compression.
+            Default is False.
+        chunk_rows : int (optional)
+            Number of rows per chunk of new datasets. Default is 1024.
+
+        Examples
+        --------
+        >>> with H5Appender('out.hdf5') as appender:
+        ...     for block in blocks:
+        ...         appender.append('signal', block)
+        '''
+        self.filepath = filepath
+        self.compression = compression
+        self.level = level
+        self.shuffle = shuffle
+        self.chunk_rows = chunk_rows
+        self.file = h5py.File(filepath, 'a')
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def append(self, name, rows):
+        '''
+        Append rows to a dataset, creating it if needed.
+
+        Parameters
+        ----------
+        name : str
+            Dataset name.
+        rows : array-like
+            Rows to append, along the first axis. A 1D array appends to a
+            1D dataset.
+        '''
+        rows = np.asarray(rows)
+        if name not in self.file:
+            self.file.create_dataset(name, shape=(0,) + rows.shape[1:],
+                                     maxshape=(None,) + rows.shape[1:],
+                                     chunks=(self.chunk_rows,) + rows.shape[1:],
+                                     dtype=rows.dtype, compression=self.compression,
+                                     compression_opts=self.level,
+                                     shuffle=self.shuffle)
+        dataset = self.file[name]
+        start = dataset.shape[0]
+        dataset.resize(start + rows.shape[0], axis=0)
+        dataset[start:] = rows
+
+    def close(self):
+        self.file.close()
+
+
+class H5Mapping:
+
+    def __init__(self, filepath):
+        '''
+        Read-only, lazy dictionary-like view of an `HDF5 <https://www.hdfgroup.org/HDF5/doc/H5.intro.html>`_
+        file. Values are h5py datasets, which are read only when sliced
+        (``mapping[key][:10]``, ``mapping[key][()]``). The file stays open
+        until close is called.
+
+        Parameters
+        ----------
+        filepath : str
+            Filepath to HDF5 file.
+        '''
+        self.filepath = filepath
+        self.file = h5py.File(filepath, mode='r')
+
+    def __contains__(self, key):
+        return key in self.file
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __getitem__(self, key):
+        return self.file[key]
+
+    def __iter__(self):
+        return iter(self.file.keys())
+
+    def __len__(self):
+        return len(self.file)
+
+    def __repr__(self):
+        return 'WrightTools.kit.H5Mapping object \'{0}\' at {1}'.format(self.filepath, str(id(self)))
+
+    def close(self):
+        self.file.close()
+
+    def items(self):
+        return [(key, self.file[key]) for key in self.file.keys()]
+
+    def keys(self):
+        return list(self.file.keys())
+
+    def values(self):
+        return [self.file[key] for key in self.file.keys()]
+
+
+def read_h5(filepath, lazy=False):
     '''
     Read from a `HDF5 <https://www.hdfgroup.org/HDF5/doc/H5.intro.html>`_
     file, returning the data within as a python dictionary.
+
+    Parameters
+    ----------
+    filepath : str
+        Filepath to HDF5 file.
+    lazy : bool (optional)
+        Toggle lazy access. If True, an H5Mapping is returned, and datasets
+        are only read when sliced. Default is False.
     
     Returns
     -------
-    OrderedDict
+    OrderedDict or H5Mapping
         Dictionary containing data from HDF5 file.    
     
     See Also
     --------
     kit.write_h5
     '''
+    if lazy:
+        return H5Mapping(filepath)
     d = collections.OrderedDict()
     h5f = h5py.File(filepath, mode='r')
     for key in h5f.keys():
@@ -635,22 +1591,99 @@ def read_headers(filepath):
         Dictionary containing header information.
     '''
     headers = collections.OrderedDict()
-    for line in open(filepath):
-        if line[0] == '#':
-            split = re.split('\: |\:\t', line)
-            key = split[0][2:]
-            headers[key] = string2item(split[1])
-        else:
-            break  # all header lines are at the beginning
+    with open(filepath, 'rb') as f:
+        for line in f:
+            if not line.startswith(b'#'):
+                break  # all header lines are at the beginning
+            line = line.decode('utf-8')
+            # key ends at the first ': ' or ':\t'
+            ends = [i for i in (line.find(': '), line.find(':\t')) if i >= 0]
+            if not ends:
+                continue
+            end = min(ends)
+            headers[line[2:end]] = string2item(line[end+2:])
+            if line[2:end] == 'binary offset':
+                break  # binary data follows
     return headers
 
 
-def write_h5(filepath, dictionary):
+class TextWriter:
+
+    def __init__(self, filepath, headers=None, fmt='%.17g', delimiter='\t',
+                 block_rows=2**14):
+        '''
+        Stream a table into a 'Wright Group formatted' text file. Headers are
+        written once, rows are formatted and written in large blocks.
+
+        Parameters
+        ----------
+        filepath : str
+            Path of file. Existing files are overwritten.
+        headers : dictionary (optional)
+            Headers, written as by write_headers. Default is None.
+        fmt : str or list of str (optional)
+            Format of each number, or of each column. Default is '%.17g'
+            (exact for 64 bit floats).
+        delimiter : str (optional)
+            Column delimiter. Default is tab.
+        block_rows : int (optional)
+            Number of rows formatted at once. Default is 2**14.
+
+        Examples
+        --------
+        >>> with TextWriter('out.data', headers) as writer:
+        ...     for block in blocks:
+        ...         writer.write(block)
+        '''
+        self.filepath = filepath
+        self.fmt = fmt
+        self.delimiter = delimiter
+        self.block_rows = block_rows
+        self.file = open(filepath, 'wb')
+        if headers is not None:
+            self.file.write(_headers_string(headers).encode('utf-8'))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        self.file.close()
+
+    def write(self, rows):
+        '''
+        Write rows to file.
+
+        Parameters
+        ----------
+        rows : array-like
+            2D array of shape (rows, columns). A 1D array is written as a
+            single row.
+        '''
+        rows = np.asarray(rows)
+        if rows.ndim == 1:
+            rows = rows[None, :]
+        if isinstance(self.fmt, string_type):
+            fmts = [self.fmt] * rows.shape[1]
+        else:
+            fmts = list(self.fmt)
+        line = self.delimiter.join(fmts) + '\n'
+        for start in range(0, rows.shape[0], self.block_rows):
+            block = rows[start:start+self.block_rows]
+            text = (line * block.shape[0]) % tuple(block.ravel().tolist())
+            self.file.write(text.encode('utf-8'))
+
+
+def write_h5(filepath, dictionary, compression='gzip', level=None,
+             shuffle=False, chunks=None):
     '''
     Save a python dictionary into an `HDF5 <https://www.hdfgroup.org/HDF5/doc/H5.intro.html>`_
     file.
     
-    Right now it only works to store numpy arrays of numbers.
+    Numpy arrays are stored as (filtered) datasets, numeric scalars as
+    scalar datasets, and everything else as strings.
     
     Parameters
     ----------
@@ -659,6 +1692,17 @@ def write_h5(filepath, dictionary):
         to the filename if it is not already there.
     dictionary : python dictionary-like
         The content to store to the HDF5 file.
+    compression : {'gzip', 'lzf', None} (optional)
+        Compression filter of arrays. lzf is much faster than gzip, at a
+        lower compression ratio. Default is 'gzip'.
+    level : int (optional)
+        gzip compression level (0-9). Default is None (h5py default).
+    shuffle : bool (optional)
+        Toggle byte shuffle filter, which often improves compression.
+        Default is False.
+    chunks : tuple or bool (optional)
+        Chunk shape of arrays, or True to let h5py guess. Default is None
+        (guessed if filters are used, contiguous otherwise).
 
     Returns
     -------
@@ -669,6 +1713,7 @@ def write_h5(filepath, dictionary):
     See Also
     --------
     kit.read_h5
+    kit.H5Appender
     '''
     # get full filepath
     if filepath[-5:] == '.hdf5':
@@ -681,7 +1726,11 @@ def write_h5(filepath, dictionary):
     # fill h5f object
     for name, data in dictionary.items():
         if type(data) == np.ndarray:
-            h5f.create_dataset(name, data=data, compression="gzip")
+            h5f.create_dataset(name, data=data, compression=compression,
+                               compression_opts=level, shuffle=shuffle,
+                               chunks=chunks)
+        elif isinstance(data, (bool, int, float, complex, np.number, np.bool_)):
+            h5f.create_dataset(name, data=data)
         else:
             # TODO: store it as a string
             data = str(data)
@@ -708,37 +1757,128 @@ def write_headers(filepath, dictionary):
     -------
     str
         Filepath of file.
+
+    See Also
+    --------
+    TextWriter
+        Write headers and rows.
+    '''
+    with open(filepath, 'wb') as f:
+        f.write(_headers_string(dictionary).encode('utf-8'))
+    # return
+    return filepath
+
+
+def _headers_string(dictionary):
+    '''
+    Text of 'Wright Group formatted' headers, one commented line per item.
     '''
-    dictionary = copy.deepcopy(dictionary)
-    # write header
-    for key, value in dictionary.items():
-        dictionary[key] = item2string(value)
     lines = []
     for key, value in dictionary.items():
+        value = item2string(value)
         if '\t' in value:
             joiner = ''
         else:
             joiner = '\t'
-        lines.append(joiner.join([key+':', value]))
-    header_str = '\n'.join(lines)
-    np.savetxt(filepath, [], header=header_str)
-    # return
-    return filepath
+        lines.append('# ' + joiner.join([key+':', value]) + '\n')
+    return ''.join(lines)
 
 
 ### array and math ############################################################
 
 
+def bin_onto_grid(points, values, grid, tolerance, interpolate_empty=True,
+                  fill_value=np.nan):
+    '''
+    Average scattered values onto a rectilinear grid by snapping each
+    point to the nearest grid index.
+
+    Points farther than tolerance from the nearest grid point along any
+    dimension are dropped. Cells that receive no points may be filled by
+    linear interpolation between the filled cells.
+
+    Parameters
+    ----------
+    points : tuple of 1D arrays
+        Coordinates of the scattered points, one array per dimension.
+    values : list of 1D arrays
+        Sets of values at points. Nans are ignored.
+    grid : list of 1D arrays
+        Points of each axis of the grid.
+    tolerance : number or list of numbers
+        Largest distance from a grid point, shared or one per dimension.
+    interpolate_empty : boolean (optional)
+        Toggle filling of empty cells by linear interpolation. Default is
+        True.
+    fill_value : number or list of numbers (optional)
+        Value of empty cells that are not interpolated, either shared or
+        one per set of values. Default is nan.
+
+    Returns
+    -------
+    tuple
+        (list of arrays of mean values, array of counts), each in the shape
+        of the grid. Counts are zero for cells filled by interpolation.
+
+    See Also
+    --------
+    interpolate_linear
+    '''
+    grid = [np.asarray(g, dtype=float) for g in grid]
+    shape = tuple(g.size for g in grid)
+    tolerance = np.broadcast_to(tolerance, (len(grid),))
+    keep = np.ones(np.size(points[0]), dtype=bool)
+    indicies = []
+    for coordinates, axis_points, tol in zip(points, grid, tolerance):
+        coordinates = np.asarray(coordinates, dtype=float).ravel()
+        # nearest grid index, axis points may be in any order
+        order = np.argsort(axis_points)
+        sorted_points = axis_points[order]
+        right = np.clip(np.searchsorted(sorted_points, coordinates), 1, max(axis_points.size - 1, 1))
+        left = right - 1
+        if axis_points.size == 1:
+            right = left = np.zeros_like(right)
+        nearest = np.where(np.abs(coordinates - sorted_points[left]) <= np.abs(sorted_points[right] - coordinates), left, right)
+        with np.errstate(invalid='ignore'):
+            keep &= np.abs(coordinates - sorted_points[nearest]) <= tol
+        indicies.append(order[nearest])
+    flat = np.ravel_multi_index(tuple(index[keep] for index in indicies), shape)
+    size = int(np.prod(shape))
+    fill_value = np.broadcast_to(fill_value, (len(values),))
+    counts = np.bincount(flat, minlength=size)
+    outs = []
+    for vals in values:
+        vals = np.asarray(vals, dtype=float).ravel()[keep]
+        finite = ~np.isnan(vals)
+        count = np.bincount(flat[finite], minlength=size)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            out = np.bincount(flat[finite], weights=vals[finite], minlength=size) / count
+        outs.append(out)
+    # fill empty cells
+    empty = counts == 0
+    if interpolate_empty and empty.any() and not empty.all():
+        cells = np.unravel_index(np.arange(size), shape)
+        coordinates = [axis_points[index] for axis_points, index in zip(grid, cells)]
+        filled = tuple(c[~empty] for c in coordinates)
+        targets = tuple(c[empty] for c in coordinates)
+        interpolated = interpolate_linear(filled, [out[~empty] for out in outs],
+                                          targets, rescale=True,
+                                          fill_value=fill_value)
+        for out, values_empty in zip(outs, interpolated):
+            out[empty] = values_empty
+    else:
+        for out, fill in zip(outs, fill_value):
+            out[empty] = fill
+    return [out.reshape(shape) for out in outs], counts.reshape(shape)
+
+
 def closest_pair(arr, give='indicies'):
     '''
     Find the pair of indices corresponding to the closest elements in an array.
     If multiple pairs are equally close, both pairs of indicies are returned.
     Optionally returns the closest distance itself.
 
-    I am sure that this could be written as a cheaper operation. I
-    wrote this as a quick and dirty method because I need it now to use on some
-    relatively small arrays. Feel free to refactor if you need this operation
-    done as fast as possible. - Blaise 2016.02.07
+    Neighbors are found by sorting, so the cost is O(n log n).
 
     Parameters
     ----------
@@ -760,20 +1900,36 @@ def closest_pair(arr, give='indicies'):
     >>> closest_pair(arr)
     [[(1,), (8,)], [(3,), (4,)]]
     '''
-    idxs = [idx for idx in np.ndindex(arr.shape)]
-    outs = []
-    min_dist = arr.max() - arr.min()
-    for idxa in idxs:
-        for idxb in idxs:
-            if idxa == idxb:
-                continue
-            dist = abs(arr[idxa]-arr[idxb])
-            if dist == min_dist:
-                if not [idxb, idxa] in outs:
-                    outs.append([idxa, idxb])
-            elif dist < min_dist:
-                min_dist = dist
-                outs = [[idxa, idxb]]
+    arr = np.asarray(arr)
+    flat = arr.ravel()
+    if flat.size < 2 or np.isnan(flat).any():
+        # no pairs (nans are never close to anything)
+        outs = []
+        min_dist = arr.max() - arr.min()
+    else:
+        order = np.argsort(flat, kind='mergesort')
+        diffs = np.diff(flat[order])
+        min_dist = diffs.min()
+        if give == 'indicies':
+            if min_dist == 0:
+                # every pair within each group of equal values
+                starts = np.flatnonzero(np.r_[True, diffs != 0])
+                stops = np.r_[starts[1:], flat.size]
+                pairs = []
+                for start, stop in zip(starts, stops):
+                    if stop - start > 1:
+                        group = np.sort(order[start:stop])
+                        pairs.extend(itertools.combinations(group.tolist(), 2))
+                pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+            else:
+                # values are distinct, closest pairs are sorted neighbors
+                where = np.flatnonzero(diffs == min_dist)
+                pairs = np.sort(np.c_[order[where], order[where+1]], axis=1)
+            pairs = pairs[np.lexsort((pairs[:, 1], pairs[:, 0]))]
+            a = zip(*np.unravel_index(pairs[:, 0], arr.shape))
+            b = zip(*np.unravel_index(pairs[:, 1], arr.shape))
+            outs = [[tuple(int(i) for i in idxa), tuple(int(i) for i in idxb)]
+                    for idxa, idxb in zip(a, b)]
     if give == 'indicies':
         return outs
     elif give == 'distance':
@@ -782,6 +1938,52 @@ def closest_pair(arr, give='indicies'):
         raise KeyError('give not recognized in closest_pair')
 
 
+def cluster_1D(arr, tolerance):
+    '''
+    Group the values of an array into clusters, within tolerance.
+
+    Values are sorted. Starting from the smallest value, each cluster
+    collects all values less than tolerance above its first (smallest)
+    member, and the next cluster starts at the first value left over.
+    Nans are ignored.
+
+    Parameters
+    ----------
+    arr : array_like
+        Input array. This will be flattened if it is not already 1D.
+    tolerance : number
+        The tolerance for belonging to the same cluster.
+
+    Returns
+    -------
+    tuple of 1D arrays
+        (means, mean absolute deviations, counts) of each cluster, in
+        ascending order.
+    '''
+    arr = np.sort(np.asarray(arr, dtype=float).ravel())
+    arr = arr[:arr.size - np.count_nonzero(np.isnan(arr))]  # nans sort last
+    # cluster boundaries, found by bisection (one step per cluster)
+    starts = []
+    start = 0
+    while start < arr.size:
+        starts.append(start)
+        stop = np.searchsorted(arr, arr[start] + tolerance, side='left')
+        # respect floating point rounding of the sum above exactly
+        while stop > start + 1 and not arr[stop-1] - arr[start] < tolerance:
+            stop -= 1
+        while stop < arr.size and arr[stop] - arr[start] < tolerance:
+            stop += 1
+        start = max(stop, start + 1)
+    starts = np.array(starts, dtype=int)
+    if not starts.size:
+        return np.array([]), np.array([]), np.array([], dtype=int)
+    counts = np.diff(np.append(starts, arr.size))
+    means = np.add.reduceat(arr, starts) / counts
+    deviations = np.abs(arr - np.repeat(means, counts))
+    deviations = np.add.reduceat(deviations, starts) / counts
+    return means, deviations, counts
+
+
 def diff(xi, yi, order=1):
     """
     Take the numerical derivative of a 1D array. Output is mapped onto the
@@ -845,6 +2047,234 @@ def fft(xi, yi, axis=0):
     return xi, yi
 
 
+def _interpolate_block(args):
+    '''
+    Interpolate one block, in a worker process of interpolate_blocked.
+    '''
+    points, values, grid, fill_value = args
+    xi = tuple(np.meshgrid(*grid, indexing='ij'))
+    try:
+        outs = interpolate_linear(points, values, xi, fill_value=fill_value)
+    except (ValueError, RuntimeError):
+        # too few (or degenerate) points to triangulate
+        shape = tuple(g.size for g in grid)
+        outs = [np.full(shape, fill, dtype=float) for fill in fill_value]
+    return outs
+
+
+def interpolate_blocked(points, values, grid, blocks=4, margin=0.5,
+                        rescale=False, fill_value=np.nan, workers=1):
+    '''
+    Linearly interpolate scattered points onto a rectilinear grid, block by
+    block.
+
+    The grid is partitioned into blocks, and each block is interpolated
+    from the points lying within it or within a margin around it, using
+    its own triangulation. No global triangulation is ever built: memory
+    and time scale with the block instead of the whole grid, and blocks
+    may be processed in parallel, each worker receiving only its own
+    points. Away from the edges of the data, results are identical to
+    global linear interpolation whenever the margin contains every global
+    simplex touching the block, which is the case for nominally gridded
+    data.
+
+    Parameters
+    ----------
+    points : tuple of 1D arrays
+        Coordinates of the scattered points, one array per dimension.
+    values : list of 1D arrays
+        Sets of values at points.
+    grid : list of 1D arrays
+        Points of each axis of the target grid.
+    blocks : int or list of int (optional)
+        Number of blocks along each axis, shared or one per axis. Default
+        is 4.
+    margin : float (optional)
+        Margin added to each side of a block when collecting points, as a
+        fraction of the block extent. Default is 0.5.
+    rescale : boolean (optional)
+        Rescale points to the unit cube before triangulation. Rescaling is
+        done globally, so that all blocks see the same geometry. Default
+        is False.
+    fill_value : number or list of numbers (optional)
+        Value used outside of the convex hull of points, either shared or
+        one per set of values. Default is nan.
+    workers : int (optional)
+        Number of processes. Default is 1.
+
+    Returns
+    -------
+    list of arrays
+        Interpolated values, in the shape of the grid.
+
+    See Also
+    --------
+    interpolate_linear
+    '''
+    points = [np.asarray(p, dtype=float).ravel() for p in points]
+    values = np.vstack([np.asarray(v, dtype=float).ravel() for v in values])
+    grid = [np.asarray(g, dtype=float) for g in grid]
+    fill_value = np.broadcast_to(fill_value, (len(values),)).tolist()
+    if rescale:
+        for i in range(len(points)):
+            offset = np.nanmin(points[i])
+            scale = np.nanmax(points[i]) - offset
+            scale = scale if scale > 0 else 1.
+            points[i] = (points[i] - offset) / scale
+            grid[i] = (grid[i] - offset) / scale
+    blocks = np.broadcast_to(blocks, (len(grid),))
+    # split every axis into (index) slices
+    splits = []
+    for axis_points, num in zip(grid, blocks):
+        edges = np.linspace(0, axis_points.size, min(int(num), axis_points.size) + 1).astype(int)
+        splits.append([slice(start, stop) for start, stop in zip(edges[:-1], edges[1:])])
+    jobs = []
+    slices = []
+    for block in itertools.product(*splits):
+        keep = np.ones(points[0].size, dtype=bool)
+        for coordinates, axis_points, s in zip(points, grid, block):
+            low = axis_points[s].min()
+            high = axis_points[s].max()
+            pad = (high - low) * margin
+            if pad == 0:
+                # single grid point along this axis, pad to the neighbors
+                pad = np.abs(np.diff(axis_points)).max() if axis_points.size > 1 else np.inf
+            with np.errstate(invalid='ignore'):
+                keep &= (coordinates >= low - pad) & (coordinates <= high + pad)
+        block_grid = [axis_points[s] for axis_points, s in zip(grid, block)]
+        jobs.append((tuple(p[keep] for p in points), values[:, keep], block_grid, fill_value))
+        slices.append(block)
+    if workers > 1:
+        import multiprocessing
+        pool = multiprocessing.Pool(int(workers))
+        try:
+            results = pool.map(_interpolate_block, jobs)
+        finally:
+            pool.close()
+            pool.join()
+    else:
+        results = [_interpolate_block(job) for job in jobs]
+    # stitch
+    shape = tuple(g.size for g in grid)
+    outs = [np.empty(shape) for _ in range(len(values))]
+    for block, result in zip(slices, results):
+        for out, block_out in zip(outs, result):
+            out[block] = block_out
+    return outs
+
+
+def interpolate_linear(points, values, xi, rescale=False, fill_value=np.nan,
+                       triangulation=None):
+    '''
+    Linearly interpolate several sets of values given at the same scattered
+    points, like scipy.interpolate.griddata with method='linear'.
+
+    The points are triangulated once and the weights are applied to all
+    sets of values at once.
+
+    Parameters
+    ----------
+    points : tuple of 1D arrays
+        Coordinates of the scattered points, one array per dimension.
+    values : list of 1D arrays
+        Sets of values at points.
+    xi : tuple of arrays
+        Coordinates to interpolate at, one array per dimension (as made
+        by np.meshgrid).
+    rescale : boolean (optional)
+        Rescale points to the unit cube before triangulation. Default is
+        False.
+    fill_value : number or list of numbers (optional)
+        Value used outside of the convex hull of points, either shared or
+        one per set of values. Default is nan.
+    triangulation : scipy.spatial.Delaunay (optional)
+        Triangulation of points, see interpolation_weights. Default is None.
+
+    Returns
+    -------
+    list of arrays
+        Interpolated values, in the shape of xi.
+
+    See Also
+    --------
+    interpolation_weights
+    '''
+    weights, outside = interpolation_weights(points, xi, rescale=rescale,
+                                             triangulation=triangulation)
+    values = np.column_stack([np.asarray(v, dtype=float) for v in values])
+    out = weights.dot(values)
+    fill_value = np.broadcast_to(fill_value, values.shape[1:])
+    out[outside] = fill_value
+    shape = np.shape(xi[0])
+    return [out[:, i].reshape(shape) for i in range(values.shape[1])]
+
+
+def interpolation_weights(points, xi, rescale=False, triangulation=None):
+    '''
+    Barycentric weights of a linear interpolation from scattered points.
+
+    Points are triangulated (Delaunay), each coordinate in xi is located
+    within a simplex, and its weights relative to the vertices of that
+    simplex are collected into a sparse matrix. Interpolating any set of
+    values at points onto xi is then a single matrix product.
+
+    Parameters
+    ----------
+    points : tuple of 1D arrays
+        Coordinates of the scattered points, one array per dimension.
+    xi : tuple of arrays
+        Coordinates to interpolate at, one array per dimension.
+    rescale : boolean (optional)
+        Rescale points to the unit cube before triangulation. Default is
+        False.
+    triangulation : scipy.spatial.Delaunay (optional)
+        Triangulation of points (after rescaling), to be reused. If None,
+        points are triangulated. Ignored for 1D points. Default is None.
+
+    Returns
+    -------
+    tuple
+        (scipy.sparse.csr_matrix of shape (xi size, number of points),
+        1D boolean array True where xi lies outside the convex hull)
+    '''
+    points = np.column_stack([np.asarray(p, dtype=float).ravel() for p in points])
+    xi = np.column_stack([np.asarray(x, dtype=float).ravel() for x in xi])
+    num_points, ndim = points.shape
+    if rescale:
+        offset = np.nanmin(points, axis=0)
+        points = points - offset
+        scale = np.nanmax(points, axis=0)
+        scale[~(scale > 0)] = 1.
+        points = points / scale
+        xi = (xi - offset) / scale
+    if ndim == 1:
+        # no triangulation needed, neighbors in sorted order
+        order = np.argsort(points[:, 0], kind='mergesort')
+        sorted_points = points[order, 0]
+        x = xi[:, 0]
+        right = np.clip(np.searchsorted(sorted_points, x, side='left'), 1, num_points - 1)
+        left = right - 1
+        with np.errstate(invalid='ignore', divide='ignore'):
+            fraction = (x - sorted_points[left]) / (sorted_points[right] - sorted_points[left])
+        outside = ~((x >= sorted_points[0]) & (x <= sorted_points[-1]))
+        fraction[~np.isfinite(fraction)] = 0.
+        vertices = np.column_stack([order[left], order[right]])
+        weights = np.column_stack([1. - fraction, fraction])
+    else:
+        if triangulation is None:
+            triangulation = spatial.Delaunay(points)
+        simplices = triangulation.find_simplex(xi)
+        outside = simplices == -1
+        transform = triangulation.transform[simplices]
+        b = np.einsum('ijk,ik->ij', transform[:, :ndim], xi - transform[:, ndim])
+        weights = np.column_stack([b, 1. - b.sum(axis=1)])
+        vertices = triangulation.simplices[simplices]
+    weights[outside] = 0.
+    rows = np.repeat(np.arange(len(xi)), vertices.shape[1])
+    matrix = sparse.csr_matrix((weights.ravel(), (rows, vertices.ravel())),
+                               shape=(len(xi), num_points))
+    return matrix, outside
+
 
 def mono_resolution(grooves_per_mm, slit_width, focal_length, output_color, output_units='wn'):
     '''
@@ -896,44 +2326,78 @@ def remove_nans_1D(arrs):
         List of 1D arrays in same order as given, with nan indicies removed.
     '''
     # find all indicies to keep
-    bads = np.array([])
+    goods = np.ones(len(arrs[0]), dtype=bool)
     for arr in arrs:
-        bad = np.array(np.where(np.isnan(arr))).flatten()
-        bads = np.hstack((bad, bads))
-    if hasattr(arrs, 'shape') and len(arrs.shape)==1:
-        goods = [i for i in np.arange(arrs.shape[0]) if i not in bads]
-    else:
-        goods = [i for i in np.arange(len(arrs[0])) if i not in bads]
+        goods &= ~np.isnan(arr)
     # apply
     return [a[goods] for a in arrs]
 
 
-def share_nans(arrs1):
+def nan_mask(arrs, infs=False):
+    '''
+    Find the union of nan positions of a list of nD arrays in a single pass.
+
+    Parameters
+    ----------
+    arrs : list of nD arrays
+        The arrays to check. All arrays must have the same shape.
+    infs : bool (optional)
+        Toggle treating infs like nans. Default is False.
+
+    Returns
+    -------
+    nD boolean array
+        True where any of the arrays is nan.
+    '''
+    mask = np.zeros(np.shape(arrs[0]), dtype=bool)
+    for arr in arrs:
+        arr = np.asarray(arr)
+        if arr.dtype.kind in 'fc':  # other kinds cannot hold nans
+            if infs:
+                np.logical_or(mask, ~np.isfinite(arr), out=mask)
+            else:
+                np.logical_or(mask, np.isnan(arr), out=mask)
+    return mask
+
+
+def share_nans(arrs1, mask=None, inplace=False):
     # Written by DJM. darienmorrow@gmail.com. January 15, 2016.    
     '''
     Takes a list of nD arrays and returns a new list of nD arrays. 
     The new list is in the same order as the old list. 
-    If one indexed element in an old array is nan then every element for that
-    index in all new arrays in the list is then nan.
+    If one indexed element in an old array is nan (or inf) then every element
+    for that index in all new arrays in the list is then nan.
     
     Parameters
     ----------
     arrs1 : list of nD arrays
         The arrays to syncronize nans from
+    mask : nD boolean array (optional)
+        Precomputed union of nans, as returned by nan_mask. If None, it is
+        computed from arrs1, with infs treated like nans. Default is None.
+    inplace : bool (optional)
+        Toggle writing nans directly into the given arrays instead of
+        copies. Default is False.
         
     Returns
     -------
     list
         List of nD arrays in same order as given, with nan indicies syncronized.
+        The dtype of each array is preserved.
+
+    See Also
+    --------
+    nan_mask
     '''
-    
-    nans = np.zeros((arrs1[0].shape))
-    
+    if mask is None:
+        mask = nan_mask(arrs1, infs=True)
+    arrs2 = []
     for arr in arrs1:
-        nans *= arr       
- 
-    arrs2 = [a + nans for a in arrs1]
-
+        if not inplace:
+            arr = np.array(arr, copy=True)
+        if arr.dtype.kind in 'fc':
+            arr[mask] = np.nan
+        arrs2.append(arr)
     return arrs2
 
 
@@ -1015,17 +2479,12 @@ def unique(arr, tolerance=1e-6):
     -------
     array
         The sorted unique values.
+
+    See Also
+    --------
+    cluster_1D
     '''
-    arr = list(arr.flatten())
-    arr.sort()
-    unique = []
-    while len(arr) > 0:
-        current = arr[0]
-        lis = [xi for xi in arr if np.abs(current - xi) < tolerance]
-        arr = [xi for xi in arr if not np.abs(lis[0] - xi) < tolerance]
-        xi_lis_average = sum(lis) / len(lis)
-        unique.append(xi_lis_average)
-    return np.array(unique)
+    return cluster_1D(arr, tolerance)[0]
 
 
 def zoom2D(xi, yi, zi, xi_zoom=3., yi_zoom=3., order=3, mode='nearest',
@@ -1149,12 +2608,13 @@ def item2string(item, sep='\t'):
     if isinstance(item, string_type):
         out += '\'' + item + '\''
     elif type(item) == list:
-        for i in range(len(item)):
-            if isinstance(item[i], string_type):
-                item[i] = '\'' + item[i] + '\''
+        strings = []
+        for i in item:
+            if isinstance(i, string_type):
+                strings.append('\'' + i + '\'')
             else:
-                item[i] = str(item[i])
-        out += ' [' + sep.join(item) + ']'
+                strings.append(str(i))
+        out += ' [' + sep.join(strings) + ']'
     elif type(item).__module__ == np.__name__:  # anything from numpy
         if hasattr(item, 'shape'):
             out = ' ' + array2string(item, sep=sep)
@@ -1223,45 +2683,84 @@ def string2array(string, sep='\t'):
     --------
     array2string
     '''
-    # discover size
-    size = string.count('\t')+1 
-    # discover dimensionality
-    dimensionality = 0
-    while string[dimensionality] == '[':
-        dimensionality += 1
-    # discover shape
-    shape = []       
-    for i in range(1, dimensionality+1)[::-1]:
-        to_match = '['*(i-1)
-        count_positive = string.count(to_match + ' ')
-        count_negative = string.count(to_match + '-')
-        shape.append(count_positive + count_negative)
-    shape[-1] = size / shape[-2]
-    for i in range(1, dimensionality-1)[::-1]:
-        shape[i] = shape[i] / shape[i-1]
-    shape = tuple([int(s) for s in shape])
-    # import list of floats
-    l = string.split(' ')
-    l = flatten_list([i.split('-') for i in l])  # annoyingly series of negative values get past previous filters
-    for i, item in enumerate(l):
-        bad_chars = ['[', ']', '\t', '\n']
-        for bad_char in bad_chars:
-            item = item.replace(bad_char, '')
-        l[i] = item
-    for i in range(len(l))[::-1]:
-        try:
-            l[i] = float(l[i])
-        except ValueError:
-            l.pop(i)
-    # create and reshape array
-    arr = np.array(l)
-    arr.shape = shape
+    string = string.strip()
+    # discover shape from nesting of brackets (one per sub-array)
+    dimensionality = len(string) - len(string.lstrip('['))
+    counts = [0] * dimensionality
+    depth = 0
+    for match in re.finditer(r'[\[\]]', string):
+        if match.group() == '[':
+            counts[depth] += 1
+            depth += 1
+        else:
+            depth -= 1
+    # import all values at once
+    arr = np.fromstring(re.sub(r'[\[\]]', ' ', string), sep=sep)
+    shape = [counts[i+1] // counts[i] for i in range(dimensionality-1)]
+    shape.append(arr.size // counts[-1])
+    arr.shape = tuple(shape)
     # finish
     return arr
 
 
+def _string2numbers(string, sep):
+    '''
+    Parse a separated list of numbers in bulk, returning a list of ints or
+    floats (as ast.literal_eval would), or None if anything else is found.
+    '''
+    if not string.strip() or '\'' in string or '"' in string:
+        return None
+    tokens = string.split(sep.strip() or sep)
+    num_items = len(tokens)
+    if any(char in string for char in '.eEnN'):
+        # every item must be a float, mixed lists keep per-item types
+        if not all(any(char in token for char in '.eEnN') for token in tokens):
+            return None
+        dtype = float
+    else:
+        # int64 saturates, leave big integers to literal_eval
+        if max(len(token.strip().lstrip('+-')) for token in tokens) > 18:
+            return None
+        dtype = np.int64
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', DeprecationWarning)
+            arr = np.fromstring(string, dtype=dtype, sep=sep)
+    except ValueError:
+        return None
+    if not arr.size == num_items:
+        return None
+    return arr.tolist()
+
+
 def string2item(string, sep='\t'):
-    # TODO: document
+    '''
+    Generate an item from a string created using item2string.
+
+    Flat lists of numbers are parsed in bulk. Everything else is evaluated
+    item by item with ast.literal_eval.
+
+    See Also
+    --------
+    item2string
+    '''
+    stripped = string.strip()
+    if string[0] == '\'' and string[-1] == '\'':
+        out = string[1:-1]
+    elif stripped[:2] == '[[' and ',' not in stripped:
+        # case of multidimensional arrays, nested lists hold commas
+        out = string2array(stripped, sep=sep)
+    elif stripped[:1] == '[' and stripped[-1:] == ']':
+        # fast path for the common case of a flat list of numbers
+        out = _string2numbers(stripped[1:-1], sep)
+        if out is None:
+            out = _string2item(string, sep)
+    else:
+        out = _string2item(string, sep)
+    return out
+
+
+def _string2item(string, sep='\t'):
     if string[0] == '\'' and string[-1] == '\'':
         out = string[1:-1]
     else:
@@ -0,0 +1,85 @@
+'''
+Modules used to reduce the shots of PyCMDS .shots files into one value per
+pixel. Shots are streamed from file in blocks, so each module is written as
+an accumulator and must define three functions:
+
+initialize(names, kinds, units, num_pixels)
+    Return a state object for a file with the given column names, kinds,
+    and units.
+process(state, pixels, shots)
+    Accumulate one block. pixels is the flat pixel index of each shot and
+    shots is an array of shape (columns, shots).
+finalize(state)
+    Return a list of (name, values, units, signed) tuples, values holding
+    one entry per pixel (nan where no shots were recorded).
+'''
+
+
+### import ####################################################################
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+
+### moments ###################################################################
+
+
+class Moments:
+
+    def __init__(self, num_pixels):
+        '''
+        Per-pixel count, mean, and sum of squared deviations of a quantity,
+        accumulated block by block.
+
+        Blocks are combined with the pairwise update of Chan et al, which is
+        numerically stable even when shots are far from zero.
+
+        Parameters
+        ----------
+        num_pixels : int
+            Number of pixels.
+        '''
+        self.count = np.zeros(num_pixels, dtype=int)
+        self._mean = np.zeros(num_pixels)
+        self._m2 = np.zeros(num_pixels)
+
+    def add(self, pixels, values):
+        '''
+        Accumulate values, ignoring nans.
+
+        Parameters
+        ----------
+        pixels : 1D array of int
+            Flat pixel index of each value.
+        values : 1D array
+            Values.
+        '''
+        keep = ~np.isnan(values)
+        pixels = pixels[keep]
+        values = values[keep]
+        size = self.count.size
+        count = np.bincount(pixels, minlength=size)
+        mean = np.bincount(pixels, weights=values, minlength=size) / np.maximum(count, 1)
+        m2 = np.bincount(pixels, weights=(values - mean[pixels])**2, minlength=size)
+        # merge with previous blocks
+        total = self.count + count
+        delta = mean - self._mean
+        self._mean += delta * count / np.maximum(total, 1)
+        self._m2 += m2 + delta**2 * self.count * count / np.maximum(total, 1)
+        self.count = total
+
+    @property
+    def mean(self):
+        out = self._mean.copy()
+        out[self.count == 0] = np.nan
+        return out
+
+    @property
+    def std(self):
+        '''
+        Population standard deviation.
+        '''
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.sqrt(self._m2 / self.count)
@@ -0,0 +1,60 @@
+'''
+Chopper demodulation: the difference of the mean of each channel over shots
+with the chopper open and with the chopper blocked.
+
+The chopper column is the column of kind 'chopper' (or, for older files,
+the column named 'chopper'). Shots with chopper values above threshold are
+considered open.
+'''
+
+
+### import ####################################################################
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+import numpy as np
+
+from . import Moments
+
+
+### define ####################################################################
+
+
+threshold = 0.5
+
+
+### process ###################################################################
+
+
+def initialize(names, kinds, units, num_pixels):
+    if 'chopper' in kinds:
+        chopper_index = kinds.index('chopper')
+    elif 'chopper' in names:
+        chopper_index = names.index('chopper')
+    else:
+        raise KeyError('no chopper column found')
+    channels = []
+    for i, kind in enumerate(kinds):
+        if kind == 'channel' and not i == chopper_index:
+            channels.append((i, names[i], units[i], Moments(num_pixels), Moments(num_pixels)))
+    return {'chopper index': chopper_index, 'channels': channels}
+
+
+def process(state, pixels, shots):
+    is_open = shots[state['chopper index']] > threshold
+    for i, name, units, opened, blocked in state['channels']:
+        opened.add(pixels[is_open], shots[i][is_open])
+        blocked.add(pixels[~is_open], shots[i][~is_open])
+
+
+def finalize(state):
+    out = []
+    for i, name, units, opened, blocked in state['channels']:
+        difference = opened.mean - blocked.mean
+        # standard error of the difference
+        with np.errstate(invalid='ignore', divide='ignore'):
+            error = np.sqrt(opened.std**2 / opened.count + blocked.std**2 / blocked.count)
+        out.append((name, difference, units, True))
+        out.append((name + '_error', error, units, False))
+    return out
@@ -0,0 +1,35 @@
+'''
+Mean and standard deviation of each channel over the shots of each pixel.
+'''
+
+
+### import ####################################################################
+
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+
+from . import Moments
+
+
+### process ###################################################################
+
+
+def initialize(names, kinds, units, num_pixels):
+    state = []
+    for i, kind in enumerate(kinds):
+        if kind == 'channel':
+            state.append((i, names[i], units[i], Moments(num_pixels)))
+    return state
+
+
+def process(state, pixels, shots):
+    for i, name, units, moments in state:
+        moments.add(pixels, shots[i])
+
+
+def finalize(state):
+    out = []
+    for i, name, units, moments in state:
+        out.append((name, moments.mean, units, None))
+        out.append((name + '_std', moments.std, units, False))
+    return out
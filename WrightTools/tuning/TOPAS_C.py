@@ -107,8 +107,7 @@ def process_C2_motortune(opa_index, data_filepath, curves, save=True):
     print('fitting wa traces')
     while file_slicer.n < file_slicer.length:
         # get data from file
-        lines = file_slicer.get(256)
-        arr = np.array([np.fromstring(line, sep='\t') for line in lines]).T
+        arr = file_slicer.get(256).T
         # fit data
         xi = arr[wa_index]
         xi = wt_units.converter(xi, 'nm', 'wn')
@@ -117,6 +116,7 @@ def process_C2_motortune(opa_index, data_filepath, curves, save=True):
         mean = wt_units.converter(mean, 'wn', 'nm')
         outs.append([amplitude, mean, width])
         wt_kit.update_progress(100*file_slicer.n/float(file_slicer.length-256))
+    file_slicer.close()
     outs = np.array(outs).T
     amp, cen, wid = outs
     # remove points with amplitudes that are ridiculous
@@ -236,8 +236,7 @@ def process_D2_motortune(opa_index, data_filepath, curves, save=True):
     print('fitting wa traces')
     while file_slicer.n < file_slicer.length:
         # get data from file
-        lines = file_slicer.get(256)
-        arr = np.array([np.fromstring(line, sep='\t') for line in lines]).T
+        arr = file_slicer.get(256).T
         # fit data
         xi = arr[wa_index]
         xi = wt_units.converter(xi, 'nm', 'wn')
@@ -246,6 +245,7 @@ def process_D2_motortune(opa_index, data_filepath, curves, save=True):
         mean = wt_units.converter(mean, 'wn', 'nm')
         outs.append([amplitude, mean, width])
         wt_kit.update_progress(100*file_slicer.n/float(file_slicer.length-256))
+    file_slicer.close()
     print(file_slicer.n, file_slicer.length)
     outs = np.array(outs).T
     amp, cen, wid = outs
@@ -331,7 +331,7 @@ def process_D2_motortune(opa_index, data_filepath, curves, save=True):
 def process_preamp_motortune(OPA_index, data_filepath, curves, save=True):
     # extract information from file
     headers = wt_kit.read_headers(data_filepath)
-    arr = np.genfromtxt(data_filepath).T
+    arr = wt_kit.read_array(data_filepath).T
     old_curve = wt_curve.from_TOPAS_crvs(curves, 'TOPAS-C', 'NON-NON-NON-Sig')
     # get array data
     array_colors = arr[headers['name'].index('wa')]
@@ -575,7 +575,7 @@ def process_SHS_motortune(OPA_index, data_filepath, curves, save=True):
     wm_len = len(headers['wm points'])
     m2_len = len(headers['w%d_Mixer_2 points'%OPA_index])
     # get arrays
-    arr = np.genfromtxt(data_filepath).T
+    arr = wt_kit.read_array(data_filepath).T
     wm = arr[wm_index]
     wm.shape = (ws_len, m2_len, wm_len)
     wm = wt_units.converter(wm, 'nm', 'wn')
@@ -698,7 +698,7 @@ def process_SFS_motortune(OPA_index, data_filepath, curves, save=True):
     wm_len = len(headers['wm points'])
     m1_len = len(headers['w%d_Mixer_1 points'%OPA_index])
     # get arrays
-    arr = np.genfromtxt(data_filepath).T
+    arr = wt_kit.read_array(data_filepath).T
     wm = arr[wm_index]
     wm.shape = (ws_len, m1_len, wm_len)
     wm = wt_units.converter(wm, 'nm', 'wn')
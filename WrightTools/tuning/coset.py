@@ -194,10 +194,9 @@ class CoSet:
         headers['control units'] = self.control_units
         headers['offset'] = self.offset_name
         headers['offset units'] = self.offset_units
-        file_path = wt_kit.write_headers(file_path, headers)
         X = np.vstack([self.control_points, self.offset_points]).T
-        with open(file_path, 'ab') as f: 
-            np.savetxt(f, X, fmt=str('%8.6f'), delimiter='\t')
+        with wt_kit.TextWriter(file_path, headers, fmt='%8.6f') as writer:
+            writer.write(X)
         if plot:
             image_path = file_path.replace('.coset', '.png')
             self.plot(autosave=True, save_path=image_path)
@@ -219,7 +218,7 @@ class CoSet:
 def from_file(path):
     # get raw information from file
     headers = wt_kit.read_headers(path)
-    arr = np.genfromtxt(path).T
+    arr = wt_kit.read_array(path).T
     name = os.path.basename(path).split(' - ')[0]
     # construct coset object
     control_name = headers['control']
@@ -609,7 +609,7 @@ class Curve:
 
 def from_800_curve(filepath):
     headers = wt_kit.read_headers(filepath)
-    arr = np.genfromtxt(filepath).T
+    arr = wt_kit.read_array(filepath).T
     colors = arr[0]
     grating = Motor(arr[1], 'Grating')
     bbo = Motor(arr[2], 'BBO')
@@ -626,7 +626,7 @@ def from_poynting_curve(filepath, subcurve=None):
     print('FROM POYNTING CURVE', filepath, subcurve)
     # read from file
     headers = wt_kit.read_headers(filepath)
-    arr = np.genfromtxt(filepath).T
+    arr = wt_kit.read_array(filepath).T
     names = headers['name']
     # colors
     colors = arr[0]
@@ -734,10 +734,8 @@ def to_800_curve(curve, save_directory):
     headers['file created'] = timestamp.RFC3339
     headers['interaction'] = curve.interaction
     headers['name'] = ['Color (wn)', 'Grating', 'BBO', 'Mixer']
-    wt_kit.write_headers(out_path, headers)
-    with open(out_path, 'ab') as f:
-        np.savetxt(f, out_arr.T, fmt=['%.2f','%.5f', '%.5f', '%.5f'],
-                   delimiter='\t')
+    with wt_kit.TextWriter(out_path, headers, fmt=['%.2f','%.5f', '%.5f', '%.5f']) as writer:
+        writer.write(out_arr.T)
     return out_path
 
 
@@ -760,10 +758,8 @@ def to_poynting_curve(curve, save_directory):
     headers['file created'] = timestamp.RFC3339
     headers['interaction'] = curve.interaction
     headers['name'] = ['Color (wn)', 'Phi', 'Theta']
-    wt_kit.write_headers(out_path, headers)
-    with open(out_path, 'ab') as f:
-        np.savetxt(f, out_arr.T, fmt=['%.2f','%.0f', '%.0f'],
-                   delimiter='\t')
+    with wt_kit.TextWriter(out_path, headers, fmt=['%.2f','%.0f', '%.0f']) as writer:
+        writer.write(out_arr.T)
     # save subcurve
     if curve.subcurve:
         curve.subcurve.save(save_directory=save_directory)
@@ -0,0 +1,45 @@
+'''
+Test data.from_Cary50 and data.from_spectra on Cary 50 files.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def write_Cary50(path, names, x, ys):
+    '''
+    Write a Cary 50 csv: a name row, a units row, then (x, y) column pairs.
+    '''
+    with open(path, 'w') as f:
+        f.write(''.join(name + ',,' for name in names) + '\n')
+        f.write('Wavelength (nm),Abs,' * len(names) + '\n')
+        for i in range(x.size):
+            f.write(''.join('{0},{1},'.format(x[i], y[i]) for y in ys) + '\n')
+        f.write('\n')
+        f.write('Collection Time: 1/1/2017 00:00:00 AM\n')
+
+
+### test ######################################################################
+
+
+def test_names(tmpdir):
+    path = str(tmpdir.join('scans.csv'))
+    x = np.linspace(800., 300., 51)
+    ys = [np.random.RandomState(i).rand(x.size) for i in range(3)]
+    write_Cary50(path, ['baseline', 'sample 1', 'sample 2'], x, ys)
+    datas = wt.data.from_Cary50(path, verbose=False)
+    assert [data.name for data in datas] == ['baseline', 'sample 1', 'sample 2']
+    for data, y in zip(datas, ys):
+        assert np.array_equal(data.axes[0].points, x)
+        assert np.array_equal(data.channels[0].values, y)
+    data = wt.data.from_spectra([path], 'Cary50', verbose=False)
+    assert data.shape == (3, x.size)
+    assert np.array_equal(data.channels[0].values, np.array(ys))
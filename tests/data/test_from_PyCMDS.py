@@ -0,0 +1,192 @@
+'''
+Test data.from_PyCMDS against the original row by row implementation.
+'''
+
+
+### import ####################################################################
+
+
+import os
+import time
+import collections
+
+import numpy as np
+import pytest
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def write_PyCMDS(path, shape, missing=0, jitter=0.01, seed=0, interpolate=False):
+    '''
+    Write a synthetic PyCMDS file.
+    '''
+    rng = np.random.RandomState(seed)
+    names = ['w{}'.format(i) for i in range(1, len(shape)+1)]
+    points = [np.linspace(1200+100*i, 1300+100*i, n) for i, n in enumerate(shape)]
+    headers = collections.OrderedDict()
+    headers['data name'] = 'test'
+    headers['data origin'] = 'scan'
+    headers['axis names'] = names
+    headers['axis identities'] = names
+    headers['axis units'] = ['nm'] * len(shape)
+    headers['axis interpolate'] = [interpolate] * len(shape)
+    headers['constant names'] = []
+    headers['constant identities'] = []
+    for name, p in zip(names, points):
+        headers[name + ' points'] = p
+    headers['name'] = [n + '_index' for n in names] + names + ['ai0', 'ai1']
+    headers['kind'] = [None] * len(names) + ['hardware'] * len(names) + ['channel'] * 2
+    headers['units'] = [None] * len(names) + ['nm'] * len(names) + ['V'] * 2
+    headers['label'] = [''] * len(names) * 2 + ['', '']
+    headers['channel signed'] = [False, False]
+    indicies = np.array(list(np.ndindex(*shape)), dtype=float)
+    coords = [p[indicies[:, i].astype(int)] + rng.uniform(-jitter, jitter, len(indicies))
+              for i, p in enumerate(points)]
+    values = [rng.rand(len(indicies)) for _ in range(2)]
+    arr = np.column_stack([indicies] + coords + values)
+    if missing:
+        arr = arr[:-missing]
+    with wt.kit.TextWriter(path, headers, fmt='%.6f') as writer:
+        writer.write(arr)
+
+
+def reference_channels(path):
+    '''
+    Channel arrays as built by the original from_PyCMDS: np.genfromtxt,
+    then one assignment per row and channel.
+    '''
+    headers = wt.kit.read_headers(path)
+    arr = np.genfromtxt(path).T
+    shape = tuple(len(headers[name + ' points']) for name in headers['axis names'])
+    indicies = arr[:len(shape)].T.astype('int64')
+    channel_indicies = [i for i, kind in enumerate(headers['kind']) if kind == 'channel']
+    zis = [np.full(shape, np.nan) for _ in channel_indicies]
+    for i in range(len(arr[0])):
+        idx = tuple(indicies[i])
+        for zi_index, arr_index in enumerate(channel_indicies):
+            zis[zi_index][idx] = arr[arr_index, i]
+    return zis
+
+
+# wall clock comparisons are flaky on loaded machines, run them on request
+benchmark = pytest.mark.skipif(not os.environ.get('WT_BENCHMARK'),
+                               reason='set WT_BENCHMARK=1 to run benchmarks')
+
+
+### test ######################################################################
+
+
+def test_matches_reference(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (6, 5, 4), missing=7)
+    data = wt.data.from_PyCMDS(path, verbose=False)
+    for channel, zi in zip(data.channels, reference_channels(path)):
+        assert np.array_equal(channel._masked_values(), zi, equal_nan=True)
+    assert np.array_equal(data.channels[0].valid, ~np.isnan(reference_channels(path)[0]))
+
+
+def test_large_matches_reference(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (12, 10, 10, 10))
+    data = wt.data.from_PyCMDS(path, verbose=False)
+    for channel, zi in zip(data.channels, reference_channels(path)):
+        assert np.array_equal(channel.values, zi)
+
+
+@benchmark
+def test_faster_than_reference(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (12, 10, 10, 10))
+    start = time.time()
+    wt.data.from_PyCMDS(path, verbose=False)
+    new = time.time() - start
+    start = time.time()
+    reference_channels(path)
+    old = time.time() - start
+    assert new < old
+
+
+def test_export_constants(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (6, 5))
+    data = wt.data.from_PyCMDS(path, verbose=False)
+    data.constants.append(wt.data.Axis(1550., 'nm', name='w3'))
+    data._update()
+    exported = data.export(str(tmpdir.join('export.data')), verbose=False)
+    new = wt.data.from_PyCMDS(exported, verbose=False)
+    assert new.constant_names == ['w3']
+    assert new.constants[0].points == 1550.
+    assert new.constants[0].units == 'nm'
+    for old, channel in zip(data.channels, new.channels):
+        assert np.array_equal(old.values, channel.values)
+
+
+def test_clip_then_normalize(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (6, 5), missing=3)
+    data = wt.data.from_PyCMDS(path, verbose=False)
+    channel = data.channels[0]
+    channel.clip(zmax=0.5, replace='nan')
+    assert not channel.valid[np.isnan(channel.values)].any()
+    channel.normalize()
+    valid = channel.valid
+    assert valid.any()
+    assert np.nanmax(channel.values[valid]) == 1.
+
+
+def follow(path, tmpdir, steps):
+    '''
+    Follow a copy of a PyCMDS file that is written in steps, with comments,
+    blank lines and an incomplete last line along the way.
+    '''
+    with open(path, 'rb') as f:
+        lines = f.readlines()
+    header = [line for line in lines if line.startswith(b'#')]
+    rows = [line for line in lines if not line.startswith(b'#')]
+    followed = str(tmpdir.join('followed.data'))
+    with open(followed, 'wb') as f:
+        f.writelines(header)
+    follower = wt.data.PyCMDSFollower(followed, verbose=False)
+    bounds = np.linspace(0, len(rows), steps + 1).astype(int)
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        with open(followed, 'ab') as f:
+            f.writelines(rows[start:stop-1])
+            f.write(b'# comment\n\n')
+            f.write(rows[stop-1][:5])
+        follower.update()
+        with open(followed, 'ab') as f:
+            f.write(rows[stop-1][5:])
+    follower.update()
+    assert follower.rows == len(rows)
+    return follower
+
+
+def test_follower(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (6, 5, 4), missing=7)
+    follower = follow(path, tmpdir, 5)
+    data = wt.data.from_PyCMDS(path, verbose=False)
+    for channel, followed in zip(data.channels, follower.data.channels):
+        assert np.array_equal(channel._masked_values(), followed._masked_values(), equal_nan=True)
+        assert followed.mask.count == channel.mask.count
+        assert followed.zmax == channel.zmax
+
+
+def test_follower_interpolated(tmpdir):
+    path = str(tmpdir.join('scan.data'))
+    write_PyCMDS(path, (12, 10), jitter=1., interpolate=True)
+    follower = follow(path, tmpdir, 40)
+    # regrid all rows at once, rescaled by axis extents as the follower does
+    data = follower.data
+    arr = wt.kit.read_array(path).T
+    points = [(arr[2+i] - a.points.min()) / np.ptp(a.points) for i, a in enumerate(data.axes)]
+    grid = [(a.points - a.points.min()) / np.ptp(a.points) for a in data.axes]
+    xi = tuple(np.meshgrid(*grid, indexing='ij'))
+    expected = wt.kit.interpolate_linear(points, arr[-2:], xi)
+    for channel, zi in zip(data.channels, expected):
+        # slivers along the edges of the data may still change
+        inner = (slice(1, -1), slice(1, -1))
+        assert np.allclose(channel.values[inner], zi[inner], rtol=1e-12, atol=1e-12, equal_nan=True)
@@ -0,0 +1,58 @@
+'''
+Test the single spectrum loaders against data.from_spectra, which shares
+their file layouts.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+x = np.linspace(800., 300., 51)
+y = np.random.RandomState(0).rand(x.size)
+
+
+def write(path, header, delimiter, footer=''):
+    with open(path, 'w') as f:
+        f.write(header)
+        for i in range(x.size):
+            f.write('{0}{1}{2}\n'.format(x[i], delimiter, y[i]))
+        f.write(footer)
+    return path
+
+
+def check(data, path, kind):
+    assert np.array_equal(data.axes[0].points, x)
+    assert np.array_equal(data.channels[0].values, y)
+    spectra = wt.data.from_spectra([path], kind, verbose=False)
+    assert np.array_equal(spectra.channels[0].values[0], y)
+
+
+### test ######################################################################
+
+
+def test_JASCO(tmpdir):
+    path = write(str(tmpdir.join('spectrum.txt')), 'header\n' * 18, '\t')
+    check(wt.data.from_JASCO(path, verbose=False), path, 'JASCO')
+
+
+def test_scope(tmpdir):
+    path = write(str(tmpdir.join('spectrum.txt')), 'header\n' * 14, '\t', '>>>>>End Spectral Data<<<<<\n')
+    check(wt.data.from_scope(path, verbose=False), path, 'scope')
+
+
+def test_shimadzu(tmpdir):
+    path = write(str(tmpdir.join('spectrum.txt')), '"sample"\n"Wavelength nm.","Abs."\n', ',')
+    check(wt.data.from_shimadzu(path, verbose=False), path, 'shimadzu')
+
+
+def test_Tensor27(tmpdir):
+    path = write(str(tmpdir.join('spectrum.dpt')), '', '\t')
+    check(wt.data.from_Tensor27(path, verbose=False), path, 'Tensor27')
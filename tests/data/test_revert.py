@@ -0,0 +1,52 @@
+'''
+Test Data.undo and Data.revert.
+'''
+
+
+### import ####################################################################
+
+
+import warnings
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def make_data():
+    axes = [wt.data.Axis(np.linspace(0, 1, 5), None, name='x'),
+            wt.data.Axis(np.linspace(0, 1, 4), None, name='y')]
+    values = np.random.RandomState(0).rand(5, 4) + 1.
+    return wt.data.Data(axes, [wt.data.Channel(values, name='signal')])
+
+
+### test ######################################################################
+
+
+def test_revert():
+    data = make_data()
+    original = data.channels[0].values.copy()
+    data.scale(kind='amplitude')
+    data.level(0, 'x', 2)
+    data.normalize()
+    data.revert()
+    assert np.allclose(data.channels[0].values, original)
+    assert data.journal == []
+
+
+def test_revert_truncated():
+    data = make_data()
+    data.journal_length = 3
+    data.normalize()
+    after_first = data.channels[0].values.copy()
+    for _ in range(3):
+        data.scale(kind='amplitude')
+    assert len(data.journal) == 3
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter('always')
+        data.revert()
+    assert [w.category for w in caught] == [wt.exceptions.JournalTruncatedWarning]
+    assert np.allclose(data.channels[0].values, after_first)
@@ -0,0 +1,35 @@
+'''
+Test kit.FileSlicer.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### test ######################################################################
+
+
+def test_get(tmpdir):
+    path = str(tmpdir.join('slicer.data'))
+    with open(path, 'w') as f:
+        f.write('# header\n1 2 3\n4 5 6\n\n7 8 9\n  \n10 11 12')
+    slicer = wt.kit.FileSlicer(path)
+    assert np.array_equal(slicer.get(2), [[1, 2, 3], [4, 5, 6]])
+    assert np.array_equal(slicer.get(3), [[7, 8, 9]])  # blank lines skipped
+    assert slicer.get(0).shape == (0, 0)
+    assert slicer.get_lines(1) == ['10 11 12']
+    slicer.close()
+
+
+def test_get_blank(tmpdir):
+    path = str(tmpdir.join('blank.data'))
+    with open(path, 'w') as f:
+        f.write('\n\n')
+    slicer = wt.kit.FileSlicer(path)
+    assert slicer.get(2).shape == (0, 0)
+    slicer.close()
@@ -0,0 +1,116 @@
+'''
+Test kit.closest_pair and kit.remove_nans_1D against the original pure
+python implementations.
+'''
+
+
+### import ####################################################################
+
+
+import os
+import time
+
+import numpy as np
+import pytest
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def reference_closest_pair(arr, give='indicies'):
+    '''
+    Original closest_pair: compare every pair of elements.
+    '''
+    idxs = [idx for idx in np.ndindex(arr.shape)]
+    outs = []
+    min_dist = arr.max() - arr.min()
+    for idxa in idxs:
+        for idxb in idxs:
+            if idxa == idxb:
+                continue
+            dist = abs(arr[idxa]-arr[idxb])
+            if dist == min_dist:
+                if not [idxb, idxa] in outs:
+                    outs.append([idxa, idxb])
+            elif dist < min_dist:
+                min_dist = dist
+                outs = [[idxa, idxb]]
+    if give == 'indicies':
+        return outs
+    elif give == 'distance':
+        return min_dist
+
+
+def reference_remove_nans_1D(arrs):
+    '''
+    Original remove_nans_1D: collect bad indicies, then keep the rest.
+    '''
+    bads = np.array([])
+    for arr in arrs:
+        bad = np.array(np.where(np.isnan(arr))).flatten()
+        bads = np.hstack((bad, bads))
+    goods = [i for i in np.arange(len(arrs[0])) if i not in bads]
+    return [a[goods] for a in arrs]
+
+
+def timed(function, *args):
+    start = time.time()
+    out = function(*args)
+    return out, time.time() - start
+
+
+# wall clock comparisons are flaky on loaded machines, run them on request
+benchmark = pytest.mark.skipif(not os.environ.get('WT_BENCHMARK'),
+                               reason='set WT_BENCHMARK=1 to run benchmarks')
+
+
+def nan_arrays():
+    rng = np.random.RandomState(2)
+    arrs = [rng.rand(5000) for _ in range(3)]
+    for arr in arrs:
+        arr[rng.randint(0, arr.size, 400)] = np.nan
+    return arrs
+
+
+### test ######################################################################
+
+
+def test_closest_pair_matches_reference():
+    rng = np.random.RandomState(0)
+    arrs = [np.array([0, 1, 2, 3, 3, 4, 5, 6, 1]),
+            rng.rand(40),
+            rng.randint(0, 30, 40).astype(float),  # many ties
+            rng.randint(0, 30, (5, 6)),
+            np.linspace(0, 1, 11)]
+    for arr in arrs:
+        assert wt.kit.closest_pair(arr) == reference_closest_pair(arr)
+        assert wt.kit.closest_pair(arr, give='distance') == reference_closest_pair(arr, give='distance')
+
+
+def test_closest_pair_large():
+    arr = np.random.RandomState(1).rand(300)
+    assert wt.kit.closest_pair(arr) == reference_closest_pair(arr)
+
+
+def test_remove_nans_1D_matches_reference():
+    arrs = nan_arrays()
+    for a, b in zip(wt.kit.remove_nans_1D(arrs), reference_remove_nans_1D(arrs)):
+        assert np.array_equal(a, b)
+
+
+@benchmark
+def test_closest_pair_faster():
+    arr = np.random.RandomState(1).rand(300)
+    new_time = timed(wt.kit.closest_pair, arr)[1]
+    old_time = timed(reference_closest_pair, arr)[1]
+    assert new_time < old_time
+
+
+@benchmark
+def test_remove_nans_1D_faster():
+    arrs = nan_arrays()
+    new_time = timed(wt.kit.remove_nans_1D, arrs)[1]
+    old_time = timed(reference_remove_nans_1D, arrs)[1]
+    assert new_time < old_time
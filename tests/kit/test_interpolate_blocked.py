@@ -0,0 +1,76 @@
+'''
+Test kit.interpolate_blocked against scipy.interpolate.griddata.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+from scipy.interpolate import griddata
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def compare(points, values, grid, edge=0., rescale=False, **kwargs):
+    '''
+    Compare with global interpolation at grid points away from the edges of
+    the data, leaving out a fraction edge of every axis on both sides.
+    '''
+    xi = tuple(np.meshgrid(*grid, indexing='ij'))
+    expected = griddata(points, values, xi, method='linear', rescale=rescale)
+    out = wt.kit.interpolate_blocked(points, [values], grid, rescale=rescale, **kwargs)[0]
+    keep = np.ones(out.shape, dtype=bool)
+    for g, x in zip(grid, xi):
+        pad = (g.max() - g.min()) * edge
+        keep &= (x >= g.min() + pad) & (x <= g.max() - pad)
+    assert keep.any()
+    out, expected = out[keep], expected[keep]
+    assert np.array_equal(np.isnan(out), np.isnan(expected))
+    assert np.allclose(out, expected, rtol=1e-12, atol=1e-12, equal_nan=True)
+
+
+def jittered_grid(shape, jitter, seed):
+    rng = np.random.RandomState(seed)
+    xi = np.meshgrid(*[np.linspace(0, 1, n) for n in shape], indexing='ij')
+    return tuple(x.ravel() + rng.uniform(-jitter, jitter, x.size) for x in xi)
+
+
+### test ######################################################################
+
+
+def test_jittered_grid_2D():
+    points = jittered_grid((30, 25), 0.005, 1)
+    points = (points[0] * 100 + 1200, points[1] * 100 + 1300)
+    values = points[0] * 0.01 - points[1] * 0.02
+    grid = [np.linspace(1200, 1300, 30), np.linspace(1300, 1400, 25)]
+    for blocks in [2, 5]:
+        compare(points, values, grid, edge=0.05, rescale=True, blocks=blocks)
+
+
+def test_jittered_grid_3D():
+    points = jittered_grid((12, 12, 12), 0.01, 2)
+    values = points[0] ** 2 + points[1] * points[2]
+    grid = [np.linspace(0, 1, 20)] * 3
+    for blocks in [2, 3, 4]:
+        compare(points, values, grid, edge=0.05, blocks=blocks)
+
+
+def test_random_3D():
+    # scattered points need wider margins to hold every global simplex
+    rng = np.random.RandomState(0)
+    points = tuple(rng.rand(3, 2000))
+    values = np.sin(3 * points[0]) + points[1] * points[2]
+    grid = [np.linspace(0, 1, 17), np.linspace(0.05, 0.95, 13), np.linspace(0, 1, 11)]
+    for blocks in [1, 2, 4, [3, 5, 2]]:
+        compare(points, values, grid, edge=0.1, blocks=blocks, margin=2)
+
+
+def test_workers():
+    points = jittered_grid((21, 19), 0.01, 3)
+    values = points[0] ** 2 - points[1]
+    grid = [np.linspace(0, 1, 21), np.linspace(0, 1, 19)]
+    compare(points, values, grid, edge=0.05, blocks=3, workers=2)
@@ -0,0 +1,66 @@
+'''
+Test kit.ParseCache.
+'''
+
+
+### import ####################################################################
+
+
+import os
+import multiprocessing
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### helpers ###################################################################
+
+
+def read(args):
+    folder, paths = args
+    cache = wt.kit.ParseCache(folder, max_bytes=2000 * 8 * 20, enabled=True)
+    for column in range(3):
+        for path in paths:
+            arr = wt.kit.read_array(path, usecols=[column])
+            cache.put(path, ('test', column), arr)
+            assert np.array_equal(cache.get(path, ('test', column)), arr)
+
+
+### test ######################################################################
+
+
+def test_get_put(tmpdir):
+    path = str(tmpdir.join('table.data'))
+    np.savetxt(path, np.arange(12.).reshape(4, 3))
+    cache = wt.kit.ParseCache(str(tmpdir.join('cache')), enabled=True)
+    assert cache.get(path, 'a') is None
+    cache.put(path, 'a', np.arange(3.))
+    index = os.path.join(cache.folder, 'index.json')
+    mtime = os.path.getmtime(index)
+    assert np.array_equal(cache.get(path, 'a'), np.arange(3.))
+    assert os.path.getmtime(index) == mtime  # hits do not rewrite the index
+    # changed file
+    np.savetxt(path, np.arange(12.).reshape(3, 4))
+    assert cache.get(path, 'a') is None
+    assert not [name for name in os.listdir(cache.folder) if name.endswith('.npy')]
+
+
+def test_concurrent(tmpdir):
+    paths = []
+    for i in range(12):
+        path = str(tmpdir.join('{}.data'.format(i)))
+        np.savetxt(path, np.random.RandomState(i).rand(2000, 3))
+        paths.append(path)
+    folder = str(tmpdir.join('cache'))
+    pool = multiprocessing.Pool(4)
+    try:
+        pool.map(read, [(folder, paths[i::4]) for i in range(4)])
+    finally:
+        pool.close()
+        pool.join()
+    cache = wt.kit.ParseCache(folder, max_bytes=2000 * 8 * 20, enabled=True)
+    index = cache._read_index()
+    files = [name[:-4] for name in os.listdir(folder) if name.endswith('.npy')]
+    assert set(index.keys()) == set(files)
+    assert sum(entry['bytes'] for entry in index.values()) <= cache.max_bytes
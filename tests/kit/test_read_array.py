@@ -0,0 +1,72 @@
+'''
+Test kit.read_array.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### test ######################################################################
+
+
+def test_matches_genfromtxt(tmpdir):
+    path = str(tmpdir.join('table.data'))
+    arr = np.random.RandomState(0).rand(1000, 7) * 1000
+    with wt.kit.TextWriter(path, {'name': 'table'}, fmt='%.6f') as writer:
+        writer.write(arr)
+    assert np.array_equal(wt.kit.read_array(path), np.genfromtxt(path))
+    assert np.array_equal(wt.kit.read_array(path, usecols=[1, 5]), np.genfromtxt(path)[:, [1, 5]])
+    assert np.array_equal(wt.kit.read_array(path, usecols=3), np.genfromtxt(path)[:, 3])
+
+
+def test_comments_and_blank_lines(tmpdir):
+    path = str(tmpdir.join('comments.data'))
+    with open(path, 'w') as f:
+        f.write('# name: test\n1 2 3\n\n4 5 6 # inline\n# trailing\n# comments\n')
+    assert np.array_equal(wt.kit.read_array(path), np.genfromtxt(path))
+
+
+def test_comments_fromstring(tmpdir, monkeypatch):
+    monkeypatch.setattr(wt.kit, '_loadtxt_compiled', False)
+    test_comments_and_blank_lines(tmpdir)
+
+
+def test_small_chunks(tmpdir):
+    path = str(tmpdir.join('chunks.data'))
+    arr = np.arange(300.).reshape(100, 3)
+    with wt.kit.TextWriter(path, fmt='%g') as writer:
+        writer.write(arr)
+    assert np.array_equal(wt.kit.read_array(path, chunksize=64), arr)
+
+
+def test_workers(tmpdir):
+    path = str(tmpdir.join('workers.data'))
+    arr = np.random.RandomState(1).rand(5000, 4)
+    with wt.kit.TextWriter(path, {'name': 'workers'}) as writer:
+        writer.write(arr[:2000])
+        writer.file.write(b'\n\n')  # blank lines leave gaps in the output buffer
+        writer.write(arr[2000:])
+    for workers in [2, 3]:
+        assert np.array_equal(wt.kit.read_array(path, workers=workers, chunksize=1000), arr)
+        assert np.array_equal(wt.kit.read_array(path, usecols=[0, 3], workers=workers), arr[:, [0, 3]])
+
+
+def test_usecols(tmpdir):
+    path = str(tmpdir.join('usecols.data'))
+    arr = np.random.RandomState(2).rand(300, 6)
+    with wt.kit.TextWriter(path, {'name': 'usecols'}) as writer:
+        writer.write(arr)
+    for usecols in [[4], [5, 0], -1, list(range(6))]:
+        assert np.array_equal(wt.kit.read_array(path, usecols=usecols, chunksize=500), arr[:, usecols])
+        blocks = list(wt.kit.iter_array(path, usecols=usecols, chunksize=500))
+        assert np.array_equal(np.concatenate(blocks), arr[:, usecols])
+
+
+def test_usecols_fromstring(tmpdir, monkeypatch):
+    monkeypatch.setattr(wt.kit, '_loadtxt_compiled', False)
+    test_usecols(tmpdir)
@@ -0,0 +1,53 @@
+'''
+Test kit.string2item against the item by item literal_eval implementation.
+'''
+
+
+### import ####################################################################
+
+
+import numpy as np
+
+import WrightTools as wt
+
+
+### test ######################################################################
+
+
+def check(item):
+    string = wt.kit.item2string(item)
+    out = wt.kit.string2item(string)
+    expected = wt.kit._string2item(string)
+    assert out == expected == item
+    assert [type(i) for i in out] == [type(i) for i in expected]
+
+
+def test_numbers():
+    check([1, 2, 3])
+    check([1.5, -2.5e-3])
+    check([1])
+
+
+def test_big_integers():
+    check([12345678901234567890, 1])
+    check([-9223372036854775808, 9223372036854775807])
+
+
+def test_mixed():
+    check([-2, 1.5])
+    check([1.5, 2])
+    check(['a', 1])
+    check([True, 2])
+    check([None, 1.])
+
+
+def test_nested():
+    check([(1, 2), (3, 4)])
+    check([(1.5, 'a')])
+    string = wt.kit.item2string([[1, 2], [3, 4]])
+    assert wt.kit.string2item(string) == wt.kit._string2item(string) == [(1, 2), (3, 4)]
+
+
+def test_array():
+    arr = np.arange(6.).reshape(2, 3)
+    assert np.array_equal(wt.kit.string2item(wt.kit.item2string(arr)), arr)